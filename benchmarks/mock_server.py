@@ -0,0 +1,346 @@
+"""Local stand-in for the Tiko GraphQL API serving synthetic accounts."""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+
+from aiohttp import web
+
+API_PATH = "/api/v3/graphql/"
+
+OPERATION_NAME = re.compile(r"(?:query|mutation)\s+(\w+)")
+
+ROOM_MODES = ("comfort", "absence", "frost", "sleep", "disableHeating")
+
+
+class MockTikoServer:
+    """Serve the HA_* queries and mutations of the integration."""
+
+    def __init__(self, properties=1, rooms=10, change_ratio=0.0, latency=0.0, seed=0):
+        """Generate an account of `properties` x `rooms` rooms."""
+        self._random = random.Random(seed)
+        self.change_ratio = change_ratio
+        self.latency = latency
+        self.calls = {}
+        self.token = "mock-token"
+        self.properties = [
+            {
+                "id": 100000 + propertyIndex,
+                "name": f"Property {propertyIndex}",
+                "mode": {"disableHeating": False},
+                "rooms": [
+                    self._build_room(100000 * (propertyIndex + 1) + roomIndex)
+                    for roomIndex in range(rooms)
+                ],
+            }
+            for propertyIndex in range(properties)
+        ]
+        self._runner = None
+        self.url = None
+
+    def _build_room(self, roomId):
+        """Return a synthetic room."""
+        return {
+            "id": roomId,
+            "name": f"Room {roomId}",
+            "currentTemperatureDegrees": round(self._random.uniform(16, 22), 1),
+            "targetTemperatureDegrees": 19.0,
+            "humidity": round(self._random.uniform(40, 70)),
+            "sensors": 1,
+            "mode": {
+                "comfort": False,
+                "absence": False,
+                "frost": False,
+                "sleep": False,
+                "disableHeating": False,
+                "__typename": "RoomModeType",
+            },
+            "status": {
+                "heatingOperating": False,
+                "sensorBatteryLow": False,
+                "__typename": "RoomStatusType",
+            },
+            "__typename": "RoomType",
+        }
+
+    def _rooms(self):
+        """Iterate over (property, room)."""
+        for prop in self.properties:
+            for room in prop["rooms"]:
+                yield prop, room
+
+    def _find_room(self, propertyId, roomId):
+        """Return a room by ids."""
+        for prop, room in self._rooms():
+            if prop["id"] == propertyId and room["id"] == roomId:
+                return room
+        return None
+
+    # -------------------------------------------
+    # Operations
+    # -------------------------------------------
+
+    def _login(self, variables):
+        return {
+            "data": {
+                "logIn": {
+                    "user": {"id": 1, "__typename": "UserType"},
+                    "token": self.token,
+                    "__typename": "LogInMutation",
+                }
+            }
+        }
+
+    def _get_data(self, variables):
+        # Make some rooms move between two polls
+        for _, room in self._rooms():
+            if self._random.random() < self.change_ratio:
+                room["currentTemperatureDegrees"] = round(
+                    room["currentTemperatureDegrees"]
+                    + self._random.choice((-0.1, 0.1)),
+                    1,
+                )
+                room["status"]["heatingOperating"] = (
+                    room["currentTemperatureDegrees"]
+                    < room["targetTemperatureDegrees"]
+                )
+
+        return {
+            "data": {
+                "properties": [
+                    {
+                        "id": prop["id"],
+                        "name": prop["name"],
+                        "mode": prop["mode"],
+                        "rooms": prop["rooms"],
+                        "__typename": "PropertyType",
+                    }
+                    for prop in self.properties
+                ]
+            }
+        }
+
+    def _get_consumption_data(self, variables):
+        hours = max(
+            0,
+            (int(variables["timestampEnd"]) - int(variables["timestampStart"]))
+            / 3600000,
+        )
+        return {
+            "data": {
+                "properties": [
+                    {
+                        "id": prop["id"],
+                        "fastConsumption": {
+                            "roomsConsumption": [
+                                {
+                                    "id": room["id"],
+                                    "name": room["name"],
+                                    "energyKwh": round(hours * 0.4, 3),
+                                    "energyWh": round(hours * 400, 0),
+                                    "__typename": "RoomConsumptionType",
+                                }
+                                for room in prop["rooms"]
+                            ],
+                            "__typename": "FastConsumptionType",
+                        },
+                        "__typename": "PropertyType",
+                    }
+                    for prop in self.properties
+                ]
+            }
+        }
+
+    def _get_consumption_series(self, variables):
+        hours = max(
+            0,
+            (int(variables["timestampEnd"]) - int(variables["timestampStart"]))
+            // 3600000,
+        )
+        return {
+            "data": {
+                "properties": [
+                    {
+                        "id": prop["id"],
+                        "fastConsumption": {
+                            "roomsConsumption": [
+                                {
+                                    "id": room["id"],
+                                    "energyWh": hours * 400,
+                                    "valuesWh": [400] * hours,
+                                    "__typename": "RoomConsumptionType",
+                                }
+                                for room in prop["rooms"]
+                            ],
+                            "__typename": "FastConsumptionType",
+                        },
+                        "__typename": "PropertyType",
+                    }
+                    for prop in self.properties
+                ]
+            }
+        }
+
+    def _get_data_and_consumption(self, variables):
+        data = self._get_data(variables)
+        consumption = self._get_consumption_data(variables)
+        for prop, propConsumption in zip(
+            data["data"]["properties"], consumption["data"]["properties"]
+        ):
+            prop["fastConsumption"] = propConsumption["fastConsumption"]
+        return data
+
+    def _set_room_mode(self, variables):
+        room = self._find_room(variables["propertyId"], variables["roomId"])
+        if room is None:
+            return {"errors": [{"message": "Room not found"}]}
+        for mode in ROOM_MODES:
+            room["mode"][mode] = mode == variables["mode"]
+        return {
+            "data": {
+                "activateRoomMode": {
+                    "id": room["id"],
+                    "targetTemperatureDegrees": room["targetTemperatureDegrees"],
+                    "mode": room["mode"],
+                    "__typename": "RoomType",
+                }
+            }
+        }
+
+    def _set_room_temperature(self, variables):
+        room = self._find_room(variables["propertyId"], variables["roomId"])
+        if room is None:
+            return {"errors": [{"message": "Room not found"}]}
+        room["targetTemperatureDegrees"] = variables["temperature"]
+        return {
+            "data": {
+                "setRoomAdjustTemperature": {
+                    "id": room["id"],
+                    "adjustTemperature": {
+                        "active": True,
+                        "endDateTime": None,
+                        "temperature": variables["temperature"],
+                        "__typename": "AdjustTemperatureType",
+                    },
+                    "__typename": "RoomType",
+                }
+            }
+        }
+
+    def _set_rooms(self, variables):
+        # Aliased mutations c<i>, executed in order like GraphQL does
+        data = {}
+        errors = []
+        i = 0
+        while f"propertyId{i}" in variables:
+            command = {
+                "propertyId": variables[f"propertyId{i}"],
+                "roomId": variables[f"roomId{i}"],
+            }
+            if f"temperature{i}" in variables:
+                command["temperature"] = variables[f"temperature{i}"]
+                result = self._set_room_temperature(command)
+            else:
+                command["mode"] = variables.get(f"mode{i}")
+                result = self._set_room_mode(command)
+            if "errors" in result:
+                data[f"c{i}"] = None
+                errors.extend(result["errors"])
+            else:
+                [data[f"c{i}"]] = result["data"].values()
+            i += 1
+
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        return response
+
+    OPERATIONS = {
+        "HA_LOGIN": "_login",
+        "HA_GET_DATA": "_get_data",
+        "HA_GET_CONSUMPTION_DATA": "_get_consumption_data",
+        "HA_GET_CONSUMPTION_SERIES": "_get_consumption_series",
+        "HA_GET_DATA_AND_CONSUMPTION": "_get_data_and_consumption",
+        "HA_SET_ROOM_MODE": "_set_room_mode",
+        "HA_SET_ROOM_TEMPERATURE": "_set_room_temperature",
+        "HA_SET_ROOMS": "_set_rooms",
+    }
+
+    # -------------------------------------------
+    # HTTP server
+    # -------------------------------------------
+
+    async def _handle(self, request):
+        """Dispatch a GraphQL request to its operation."""
+        payload = await request.json()
+        query = payload.get("query", "")
+        match = OPERATION_NAME.search(query)
+        operation = match.group(1) if match else None
+        if operation not in self.OPERATIONS:
+            return web.json_response({"errors": [{"message": "Unknown operation"}]})
+
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if operation != "HA_LOGIN" and (
+            request.headers.get("Authorization") != f"Token {self.token}"
+        ):
+            return web.json_response(
+                {"errors": [{"message": "Authentication credentials were not provided"}]}
+            )
+
+        data = getattr(self, self.OPERATIONS[operation])(payload.get("variables") or {})
+        response = web.Response(text=json.dumps(data), content_type="application/json")
+        if operation == "HA_LOGIN":
+            response.set_cookie("csrftoken", "mock-csrf")
+            response.set_cookie("USER_SESSION_member_space", "mock-member-space")
+        return response
+
+    async def start(self, host="localhost", port=0):
+        """Start the server, return its GraphQL URL."""
+        app = web.Application()
+        app.router.add_post(API_PATH, self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}{API_PATH}"
+        return self.url
+
+    async def stop(self):
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _serve(args):
+    server = MockTikoServer(
+        properties=args.properties,
+        rooms=args.rooms,
+        change_ratio=args.change_ratio,
+        latency=args.latency,
+        seed=args.seed,
+    )
+    url = await server.start(port=args.port)
+    print(f"Mock Tiko API listening on {url}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--properties", type=int, default=1)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--change-ratio", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8080)
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Offline benchmark of the Tiko refresh hot path against the mock API.
+
+Usage (from the repository root, with Home Assistant installed):
+
+    python -m benchmarks.run --properties 2 --rooms 12 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.tiko.api import TikoApiClient, TikoAuthManager
+from custom_components.tiko.classes.TikoBatterySensor import TikoBatterySensor
+from custom_components.tiko.classes.TikoClimate import TikoClimate
+from custom_components.tiko.classes.TikoConsumptionDataUpdateCoordinator import (
+    TikoConsumptionDataUpdateCoordinator,
+)
+from custom_components.tiko.classes.TikoConsumptionSensor import TikoConsumptionSensor
+from custom_components.tiko.classes.TikoDataUpdateCoordinator import (
+    TikoDataUpdateCoordinator,
+)
+from custom_components.tiko.classes.TikoHumiditySensor import TikoHumiditySensor
+from custom_components.tiko.classes.TikoTemperatureSensor import TikoTemperatureSensor
+from custom_components.tiko.const import CONF_API_URL
+
+from .mock_server import MockTikoServer
+
+MANIFEST = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "tiko", "manifest.json"
+)
+
+
+def _summary(samples):
+    """Return latency statistics (ms) of a list of durations (s)."""
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+        "max_ms": samples[-1],
+    }
+
+
+async def _timed(samples, coroutine_factory, iterations):
+    """Run a coroutine `iterations` times and record its durations."""
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await coroutine_factory()
+        samples.append(time.perf_counter() - start)
+
+
+async def _measure_allocations(coroutine_factory, iterations):
+    """Return the memory allocated by a coroutine."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    for _ in range(iterations):
+        await coroutine_factory()
+    after = tracemalloc.take_snapshot()
+    [_, peak] = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    return {
+        "iterations": iterations,
+        "allocated_blocks_per_refresh": sum(stat.count_diff for stat in stats)
+        / iterations,
+        "allocated_bytes_per_refresh": sum(stat.size_diff for stat in stats)
+        / iterations,
+        "peak_bytes": peak,
+    }
+
+
+def _build_entities(hass, coordinator, consumptionCoordinator):
+    """Create the entities of every room like the platforms do."""
+    entities = []
+    for prop in coordinator.data:
+        for room in prop.rooms:
+            kwargs = {"property_id": prop.id, "room": room}
+            entities.append(TikoClimate(coordinator=coordinator, **kwargs))
+            entities.append(TikoHumiditySensor(coordinator=coordinator, **kwargs))
+            entities.append(
+                TikoTemperatureSensor(
+                    coordinator=coordinator, type="temperature_current", **kwargs
+                )
+            )
+            entities.append(
+                TikoTemperatureSensor(
+                    coordinator=coordinator, type="temperature_target", **kwargs
+                )
+            )
+            entities.append(TikoBatterySensor(coordinator=coordinator, **kwargs))
+            entities.append(
+                TikoConsumptionSensor(coordinator=consumptionCoordinator, **kwargs)
+            )
+
+    # Attach them to hass without a platform
+    for index, entity in enumerate(entities):
+        entity.hass = hass
+        domain = "climate" if isinstance(entity, TikoClimate) else "sensor"
+        entity.entity_id = f"{domain}.tiko_bench_{index}"
+    return entities
+
+
+async def run(args):
+    """Run every benchmark and return the results."""
+    server = MockTikoServer(
+        properties=args.properties,
+        rooms=args.rooms,
+        change_ratio=args.change_ratio,
+        latency=args.latency / 1000,
+        seed=args.seed,
+    )
+    url = await server.start()
+
+    with tempfile.TemporaryDirectory() as configDir:
+        hass = HomeAssistant(configDir)
+        try:
+            from homeassistant.helpers import frame
+
+            frame.async_setup(hass)
+        except (ImportError, AttributeError):
+            pass
+
+        # The coordinators read the enabled entities and the room devices
+        await dr.async_load(hass)
+        await er.async_load(hass)
+
+        entry = SimpleNamespace(
+            entry_id="benchmark",
+            data={
+                CONF_API_URL: url,
+                CONF_USERNAME: "benchmark@example.com",
+                CONF_PASSWORD: "benchmark",
+            },
+        )
+        client = TikoApiClient(url)
+        auth = TikoAuthManager(client, "benchmark@example.com", "benchmark")
+        coordinator = TikoDataUpdateCoordinator(hass, entry, auth)
+        consumptionCoordinator = TikoConsumptionDataUpdateCoordinator(
+            hass, entry, auth, coordinator
+        )
+
+        results = {}
+        try:
+            # Warm up: login, connection pool, first data
+            await coordinator.async_refresh()
+            await consumptionCoordinator.async_refresh()
+
+            # End to end refresh latency
+            samples = []
+            await _timed(samples, coordinator.async_refresh, args.iterations)
+            results["data_refresh"] = _summary(samples)
+
+            samples = []
+            await _timed(
+                samples, consumptionCoordinator.async_refresh, args.iterations
+            )
+            results["consumption_refresh"] = _summary(samples)
+
+            # Allocations of a refresh
+            results["data_refresh_allocations"] = await _measure_allocations(
+                coordinator.async_refresh, args.iterations
+            )
+
+            # Commands as sent by the entities: queued, then flushed as one mutation
+            prop = coordinator.data[0]
+            room = prop.rooms[0]
+
+            async def setRoomTemperature():
+                coordinator.queue_room_temperature(prop.id, room.id, 20.0)
+                await coordinator.async_flush_commands()
+
+            async def setRoomMode():
+                coordinator.queue_room_mode(prop.id, room.id, "comfort")
+                await coordinator.async_flush_commands()
+
+            samples = []
+            await _timed(samples, setRoomTemperature, args.iterations)
+            results["set_room_temperature"] = _summary(samples)
+            samples = []
+            await _timed(samples, setRoomMode, args.iterations)
+            results["set_room_mode"] = _summary(samples)
+
+            async def setRooms():
+                for room in prop.rooms:
+                    coordinator.queue_room_mode(prop.id, room.id, "comfort")
+                    coordinator.queue_room_temperature(prop.id, room.id, 20.0)
+                await coordinator.async_flush_commands()
+
+            samples = []
+            await _timed(samples, setRooms, args.iterations)
+            results["set_rooms"] = _summary(samples)
+
+            # Per entity state write cost
+            entities = _build_entities(hass, coordinator, consumptionCoordinator)
+            writes = {}
+            for entity in entities:
+                name = type(entity).__name__
+                start = time.perf_counter()
+                for _ in range(args.iterations):
+                    entity.async_write_ha_state()
+                writes.setdefault(name, []).append(
+                    (time.perf_counter() - start) / args.iterations
+                )
+            results["state_write"] = {
+                name: _summary(samples) for name, samples in writes.items()
+            }
+
+            # Listener dispatch of a refresh, including the skipped writes
+            for entity in entities:
+                entity.coordinator.async_add_listener(entity._handle_coordinator_update)
+            suppressed = coordinator.suppressed_writes
+            samples = []
+            await _timed(samples, coordinator.async_refresh, args.iterations)
+            results["data_refresh_with_entities"] = _summary(samples)
+            results["suppressed_writes_per_refresh"] = (
+                coordinator.suppressed_writes - suppressed
+            ) / args.iterations
+
+            results["api_calls"] = dict(server.calls)
+        finally:
+            await coordinator.async_shutdown()
+            await consumptionCoordinator.async_shutdown()
+            await client.close()
+            await server.stop()
+            await hass.async_stop(force=True)
+
+    with open(MANIFEST, encoding="utf-8") as manifest:
+        version = json.load(manifest)["version"]
+
+    return {
+        "version": version,
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {
+            "properties": args.properties,
+            "rooms": args.rooms,
+            "change_ratio": args.change_ratio,
+            "latency_ms": args.latency,
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--properties", type=int, default=1)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument(
+        "--change-ratio",
+        type=float,
+        default=0.1,
+        help="share of the rooms changing between two polls",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="simulated API latency (ms)"
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
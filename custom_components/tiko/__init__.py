@@ -1,13 +1,24 @@
 import logging
-from .const import DOMAIN
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.helpers.storage import Store
+from .api import TikoApiClient, TikoAuthManager, TikoRateLimiter
+from .const import (
+    CONF_API_URL,
+    CONF_TOKENS,
+    CONSUMPTION_STORAGE_KEY,
+    DATA_RATE_LIMITERS,
+    DEFAULT_API_URL,
+    DOMAIN,
+    SNAPSHOT_STORAGE_KEY,
+    STORAGE_VERSION,
+)
 from .classes.TikoDataUpdateCoordinator import TikoDataUpdateCoordinator
 from .classes.TikoConsumptionDataUpdateCoordinator import (
     TikoConsumptionDataUpdateCoordinator,
 )
-from datetime import timedelta
+from .classes.TikoStatisticsImporter import TikoStatisticsImporter
 
 _LOGGER = logging.getLogger(__name__)
-UPDATE_INTERVAL = timedelta(seconds=30)
 
 PLATFORMS = ["sensor", "climate"]
 
@@ -21,23 +32,65 @@ async def async_setup_entry(hass, config_entry):
     if not isinstance(entry_id, str):
         entry_id = str(entry_id)
 
-    # Data coordinator setup
-    coordinator = TikoDataUpdateCoordinator(hass, config_entry)
-    consumptionCoordinator = TikoConsumptionDataUpdateCoordinator(hass, config_entry)
+    # Entries of the same account share its request rate
+    apiUrl = config_entry.data.get(CONF_API_URL) or DEFAULT_API_URL
+    rateLimiter = hass.data.setdefault(DATA_RATE_LIMITERS, {}).setdefault(
+        (apiUrl, config_entry.data[CONF_USERNAME].lower()), TikoRateLimiter()
+    )
 
-    # Try to get initial data
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:
-        _LOGGER.error("Error getting initial data: %s", err)
-        return False
+    # API client and authentication shared by both coordinators
+    client = TikoApiClient(apiUrl, rateLimiter)
+    auth = TikoAuthManager(
+        client,
+        config_entry.data[CONF_USERNAME],
+        config_entry.data[CONF_PASSWORD],
+        onLogin=lambda tokens: hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_TOKENS: tokens}
+        ),
+    )
 
-    # Store coordinators
-    hass.data[DOMAIN][entry_id] = [coordinator, consumptionCoordinator]
+    # Reuse the tokens of the last login, they are replaced once rejected
+    if config_entry.data.get(CONF_TOKENS):
+        client.setTokens(config_entry.data[CONF_TOKENS])
+
+    # Data coordinator setup
+    coordinator = TikoDataUpdateCoordinator(hass, config_entry, auth)
+    consumptionCoordinator = TikoConsumptionDataUpdateCoordinator(
+        hass, config_entry, auth, coordinator
+    )
+
+    # Seed the coordinators with the last known data and refresh in background,
+    # the consumption is only fetched if its entities are enabled
+    await consumptionCoordinator.async_load_snapshot()
+    consumptionCoordinator.async_start()
+    if await coordinator.async_load_snapshot():
+        config_entry.async_create_background_task(
+            hass, coordinator.async_refresh(), "tiko_first_refresh"
+        )
+
+    # Without snapshot, try to get initial data
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception as err:
+            _LOGGER.error("Error getting initial data: %s", err)
+            await coordinator.async_shutdown()
+            await client.close()
+            return False
+
+    # Store coordinators and API client
+    hass.data[DOMAIN][entry_id] = [coordinator, consumptionCoordinator, client]
 
     # Init entities
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
+    # Import the hourly consumption as long-term statistics, only if it is used.
+    # Enabling a consumption entity reloads the entry.
+    if consumptionCoordinator.has_enabled_entities():
+        importer = TikoStatisticsImporter(hass, coordinator, auth)
+        importer.async_start()
+        config_entry.async_on_unload(importer.async_stop)
+
     # Indicate that the initialization was successful
     return True
 
@@ -55,8 +108,18 @@ async def async_unload_entry(hass, config_entry):
         config_entry, PLATFORMS
     )
 
-    # Clean HASS object
+    # Clean HASS object and close the API client
     if unload_ok and entry_id in hass.data[DOMAIN]:
-        hass.data[DOMAIN].pop(entry_id)
+        [coordinator, _, client] = hass.data[DOMAIN].pop(entry_id)
+        await coordinator.async_shutdown()
+        await client.close()
 
     return unload_ok
+
+
+async def async_remove_entry(hass, config_entry):
+    """Remove the stored data of a config entry."""
+    for key in (CONSUMPTION_STORAGE_KEY, SNAPSHOT_STORAGE_KEY):
+        await Store(
+            hass, STORAGE_VERSION, key.format(config_entry.entry_id)
+        ).async_remove()
@@ -1,51 +1,532 @@
 import aiohttp
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
 import logging
+import random
 import time
+from datetime import datetime, timezone
+from typing import NamedTuple
 
+from yarl import URL
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .const import DEFAULT_API_URL
+from .models import (
+    parseConsumption,
+    parseProperties,
+    parseRoomModeResult,
+)
 from .queries import (
     MUTATION_LOGIN,
     MUTATION_SET_ROOM_MODE,
     MUTATION_SET_ROOM_TEMPERATURE,
     QUERY_GET_DATA,
     QUERY_GET_CONSUMPTION_DATA,
+    QUERY_GET_CONSUMPTION_SERIES,
+    QUERY_GET_DATA_AND_CONSUMPTION,
+    buildRoomsMutation,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Instrumented operations
+OPERATIONS = {
+    MUTATION_LOGIN: "login",
+    QUERY_GET_DATA: "get_data",
+    QUERY_GET_CONSUMPTION_DATA: "get_consumption_data",
+    QUERY_GET_CONSUMPTION_SERIES: "get_consumption_series",
+    QUERY_GET_DATA_AND_CONSUMPTION: "get_data_and_consumption",
+    MUTATION_SET_ROOM_MODE: "set_room_mode",
+    MUTATION_SET_ROOM_TEMPERATURE: "set_room_temperature",
+}
+OPERATION_NAMES = (
+    *OPERATIONS.values(),
+    "set_rooms",
+    "other",
+)
+
+STATIC_HEADERS = {
+    "Content-Type": "application/json",
+    "User-agent": "Mozilla/5.0 (Linux; Android 13; Pixel 4a Build/T1B3.221003.003; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/106.0.5249.126 Mobile Safari/537.36",
+}
 
-async def gqlCall(apiUrl, query, variables=None, tokens=None):
-    """Call the GraphQL API using auth tokens."""
+# Keep idle connections open longer than the slowest polling interval so they get reused
+KEEPALIVE_TIMEOUT = 150
+MAX_CONNECTIONS = 4
 
-    gqlApi = (
-        apiUrl if apiUrl is not None else "https://particuliers-tiko.fr/api/v3/graphql/"
-    )
+# Requests taking longer (seconds) are counted as timeouts
+REQUEST_TIMEOUT = 8
 
-    # Generate headers
-    headers = {
-        "Content-Type": "application/json",
-        "User-agent": "Mozilla/5.0 (Linux; Android 13; Pixel 4a Build/T1B3.221003.003; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/106.0.5249.126 Mobile Safari/537.36",
-    }
-    if tokens and tokens["token"]:
-        headers["Authorization"] = f"Token {tokens['token']}"
-    if tokens and tokens["csrf_token"] and tokens["member_space"]:
-        headers["Cookie"] = (
-            f"csrftoken={tokens['csrf_token']}; USER_SESSION_member_space={tokens['member_space']}"
-        )
+# Read-only queries are retried on transient errors, mutations are sent once
+IDEMPOTENT_OPERATIONS = (
+    "get_data",
+    "get_consumption_data",
+    "get_consumption_series",
+    "get_data_and_consumption",
+)
+MAX_RETRIES = 2
+
+# Bounds (seconds) of the jittered exponential backoff between two attempts
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4
+
+# Calls failing in a row before the circuit opens, and its open duration (seconds)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 60
+
+# Requests per second allowed for an account, and the size of a burst
+RATE_LIMIT = 1
+RATE_LIMIT_BURST = 10
+
+# Waiting calls are served by priority, user commands before the polls
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+PRIORITY_BACKGROUND = 2
+OPERATION_PRIORITIES = {
+    "login": PRIORITY_COMMAND,
+    "set_room_mode": PRIORITY_COMMAND,
+    "set_room_temperature": PRIORITY_COMMAND,
+    "set_rooms": PRIORITY_COMMAND,
+    "get_data": PRIORITY_POLL,
+    "get_data_and_consumption": PRIORITY_POLL,
+    "get_consumption_data": PRIORITY_BACKGROUND,
+    "get_consumption_series": PRIORITY_BACKGROUND,
+}
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, float("inf"))
+
+# Returned instead of the data when the response is byte-identical to the previous one
+UNCHANGED = object()
+
+# Error messages returned by the API when the auth tokens are not valid anymore
+AUTH_ERROR_MESSAGES = ("authenticat", "permission", "logged in", "expired")
+
+
+def jsonDumps(data):
+    """Serialize to JSON bytes with the fastest available backend."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def jsonLoads(raw):
+    """Deserialize JSON bytes with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Request bodies of the queries without variables, they never change
+_CONSTANT_BODIES = {}
+
+
+def encodePayload(query, variables=None):
+    """Return the JSON body of a GraphQL call."""
+    if variables:
+        return jsonDumps({"query": query, "variables": variables})
+    if query not in _CONSTANT_BODIES:
+        _CONSTANT_BODIES[query] = jsonDumps({"query": query, "variables": {}})
+    return _CONSTANT_BODIES[query]
+
+
+class TikoApiStats:
+    """Counters and latency histogram of one API operation."""
+
+    def __init__(self):
+        """Stats initialization."""
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.totalLatency = 0.0
+        self.lastLatency = None
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+        self.responseBytes = 0
+        self.lastResponseSize = None
+        self.lastSuccess = None
+
+    def _recordLatency(self, latency):
+        self.calls += 1
+        self.totalLatency += latency
+        self.lastLatency = latency
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.histogram[index] += 1
+                break
+
+    def recordSuccess(self, latency, size):
+        """Record a successful call."""
+        self._recordLatency(latency)
+        self.responseBytes += size
+        self.lastResponseSize = size
+        self.lastSuccess = datetime.now(timezone.utc)
+
+    def recordError(self, latency):
+        """Record a failed call."""
+        self._recordLatency(latency)
+        self.errors += 1
+
+    def recordTimeout(self, latency):
+        """Record a call that timed out."""
+        self._recordLatency(latency)
+        self.timeouts += 1
+
+    def asDict(self):
+        """Return the stats as a serializable dict."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "mean_latency_ms": (
+                round(self.totalLatency / self.calls * 1000, 1) if self.calls else None
+            ),
+            "last_latency_ms": (
+                round(self.lastLatency * 1000, 1)
+                if self.lastLatency is not None
+                else None
+            ),
+            "latency_histogram": {
+                f"<={bound}s": count
+                for bound, count in zip(LATENCY_BUCKETS, self.histogram)
+            },
+            "response_bytes": self.responseBytes,
+            "last_response_size": self.lastResponseSize,
+            "last_success": (
+                self.lastSuccess.isoformat() if self.lastSuccess else None
+            ),
+        }
+
+
+class TikoApiResult(NamedTuple):
+    """Successful response of a GraphQL call."""
+
+    tokens: dict
+    data: object
+
+
+class TikoApiError(Exception):
+    """Raised when a GraphQL call fails."""
+
+    def __init__(self, message, status=None, retryable=False):
+        """Error initialization."""
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class TikoCircuitOpenError(TikoApiError):
+    """Raised without calling the API while it is considered down."""
 
-    # Payload
-    payload = {"query": query, "variables": variables or {}}
 
-    # Init HTTP session
-    async with aiohttp.ClientSession() as session:
+class TikoAuthError(Exception):
+    """Raised when the API rejects the auth tokens or the login fails."""
+
+
+def isAuthError(data):
+    """Return True if the GraphQL response reports an authentication failure."""
+    if not data or "errors" not in data:
+        return False
+    for error in data["errors"]:
+        message = str(error.get("message", "")).lower()
+        if any(pattern in message for pattern in AUTH_ERROR_MESSAGES):
+            return True
+    return False
+
+
+class TikoCircuitBreaker:
+    """Stop calling the API after repeated failures, then probe it again."""
+
+    def __init__(
+        self,
+        failureThreshold=CIRCUIT_FAILURE_THRESHOLD,
+        resetTimeout=CIRCUIT_RESET_TIMEOUT,
+    ):
+        """Breaker initialization."""
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self.failures = 0
+        self.openedAt = None
+        self._probing = False
+
+    @property
+    def state(self):
+        """Return closed, open or half_open."""
+        if self.openedAt is None:
+            return "closed"
+        if time.monotonic() - self.openedAt < self.resetTimeout:
+            return "open"
+        return "half_open"
+
+    def check(self):
+        """Raise TikoCircuitOpenError if no call should be made now.
+
+        Return True if the call is the one probing the API.
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probing):
+            raise TikoCircuitOpenError("Tiko API unavailable, circuit open")
+
+        # A single call probes the API once the reset timeout elapsed
+        if state == "half_open":
+            self._probing = True
+            return True
+        return False
+
+    def releaseProbe(self):
+        """Let another call probe the API, the probe ended without a result."""
+        self._probing = False
+
+    def recordSuccess(self):
+        """Close the circuit."""
+        self.failures = 0
+        self.openedAt = None
+        self._probing = False
+
+    def recordFailure(self):
+        """Count a failed call, opening the circuit past the threshold."""
+        self.failures += 1
+        self._probing = False
+        if self.openedAt is not None or self.failures >= self.failureThreshold:
+            if self.openedAt is None:
+                _LOGGER.warning(
+                    "Tiko API failed %d times in a row, pausing calls for %d s",
+                    self.failures,
+                    self.resetTimeout,
+                )
+            self.openedAt = time.monotonic()
+
+
+class TikoRateLimiter:
+    """Token bucket bounding the request rate of an account."""
+
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_LIMIT_BURST):
+        """Limiter initialization."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updatedAt = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._timer = None
+
+    def _refill(self):
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updatedAt) * self.rate
+        )
+        self._updatedAt = now
+
+    async def acquire(self, priority=PRIORITY_POLL):
+        """Wait for a token, the calls of lower priority value are served first."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Give back a token granted to a cancelled call
+            if future.done() and not future.cancelled():
+                self._tokens += 1
+            raise
+
+    def _schedule(self):
+        """Wake up the waiters once the next token is available."""
+        if self._timer is not None:
+            return
+        self._refill()
+        delay = max(0, (1 - self._tokens) / self.rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self):
+        """Hand the available tokens to the waiters by priority."""
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            [_, _, future] = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+        # Forget the cancelled calls
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            self._schedule()
+
+
+class TikoApiClient:
+    """Long-lived client for the Tiko GraphQL API."""
+
+    def __init__(self, apiUrl=None, rateLimiter=None):
+        """Client initialization."""
+        self._apiUrl = apiUrl if apiUrl is not None else DEFAULT_API_URL
+        self._rateLimiter = rateLimiter
+        self._session = None
+        self.tokens = None
+
+        # Duration (seconds) of the last JSON decode
+        self.lastDecodeTime = None
+
+        # Digest of the last response of the deduplicated queries
+        self._digests = {}
+
+        # Instrumentation of each operation
+        self.stats = {name: TikoApiStats() for name in OPERATION_NAMES}
+
+        # Shared by every call of the config entry
+        self.circuitBreaker = TikoCircuitBreaker()
+
+        # Static headers, the authorization one is added once logged in
+        self._headers = dict(STATIC_HEADERS)
+
+    def _getSession(self):
+        """Return the HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=MAX_CONNECTIONS, keepalive_timeout=KEEPALIVE_TIMEOUT
+                ),
+                cookie_jar=aiohttp.CookieJar(),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            )
+            self._updateCookies()
+        return self._session
+
+    def _updateCookies(self):
+        """Push the session cookies of the current tokens into the cookie jar."""
+        if self._session is None or not self.tokens:
+            return
+        if self.tokens.get("csrf_token") and self.tokens.get("member_space"):
+            self._session.cookie_jar.update_cookies(
+                {
+                    "csrftoken": self.tokens["csrf_token"],
+                    "USER_SESSION_member_space": self.tokens["member_space"],
+                },
+                URL(self._apiUrl),
+            )
+
+    def setTokens(self, tokens):
+        """Use the given auth tokens for the next calls."""
+        self.tokens = tokens
+
+        # Precompute headers
+        headers = dict(STATIC_HEADERS)
+        if tokens and tokens.get("token"):
+            headers["Authorization"] = f"Token {tokens['token']}"
+        self._headers = headers
+
+        self._updateCookies()
+
+    async def close(self):
+        """Close the HTTP session and its connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def forgetDigest(self, operation="get_data"):
+        """Decode the next response of an operation even if it did not change."""
+        self._digests.pop(operation, None)
+
+    async def gqlCall(self, query, variables=None, dedupe=False, operation=None):
+        """Call the GraphQL API using auth tokens, return a TikoApiResult.
+
+        The operation name is found from the query unless it is built at runtime.
+
+        Idempotent queries are retried with a jittered exponential backoff on
+        transient errors. TikoApiError is raised once the call failed.
+
+        With dedupe, the data is UNCHANGED when the response body is identical
+        to the previous one of the same operation.
+        """
+
+        # Payload
+        body = encodePayload(query, variables)
+        if operation is None:
+            operation = OPERATIONS.get(query, "other")
+        stats = self.stats[operation]
+        retries = MAX_RETRIES if operation in IDEMPOTENT_OPERATIONS else 0
+
+        # Don't call the API while it is down
+        probe = self.circuitBreaker.check()
+        try:
+            return await self._gqlAttempts(operation, body, dedupe, stats, retries)
+        finally:
+            # A cancelled probe must not keep the circuit open
+            if probe:
+                self.circuitBreaker.releaseProbe()
+
+    async def _gqlAttempts(self, operation, body, dedupe, stats, retries):
+        """Send a request, retrying it on transient errors."""
+        attempt = 0
+        while True:
+            # Share the request rate of the account with the other calls
+            if self._rateLimiter is not None:
+                await self._rateLimiter.acquire(
+                    OPERATION_PRIORITIES.get(operation, PRIORITY_POLL)
+                )
+
+            try:
+                result = await self._post(operation, body, dedupe, stats)
+            except TikoAuthError:
+                # The API answered, it is up
+                self.circuitBreaker.recordSuccess()
+                raise
+            except TikoApiError as err:
+                if not err.retryable or attempt >= retries:
+                    self.circuitBreaker.recordFailure()
+                    raise
+                attempt += 1
+                delay = random.uniform(
+                    0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+                )
+                _LOGGER.debug(
+                    "Retrying in %.2f s (%d/%d): %s", delay, attempt, retries, err
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.circuitBreaker.recordSuccess()
+            return result
+
+    async def _post(self, operation, body, dedupe, stats):
+        """Send a single request, raise TikoApiError if it fails."""
+        start = time.perf_counter()
+
         try:
             # Exec HTTP POST query
-            async with session.post(gqlApi, json=payload, headers=headers) as response:
+            async with self._getSession().post(
+                self._apiUrl, data=body, headers=self._headers
+            ) as response:
+                # If the tokens are rejected
+                if response.status in (401, 403):
+                    stats.recordError(time.perf_counter() - start)
+                    raise TikoAuthError(f"Request rejected ({response.status})")
+
                 # If not sucessful
                 if response.status != 200:
-                    _LOGGER.error(
+                    _LOGGER.debug(
                         "Request error %d: %s", response.status, await response.text()
                     )
-                    return None
+                    stats.recordError(time.perf_counter() - start)
+                    raise TikoApiError(
+                        f"Request error {response.status}",
+                        status=response.status,
+                        retryable=response.status == 429 or response.status >= 500,
+                    )
 
                 # Get tokens
                 outTokens = {}
@@ -63,123 +544,323 @@ async def gqlCall(apiUrl, query, variables=None, tokens=None):
                     ].value
 
                 # Get JSON response
-                response_data = await response.json()
+                raw = await response.read()
+                latency = time.perf_counter() - start
+                if dedupe:
+                    digest = hashlib.blake2b(raw, digest_size=16).digest()
+                    if self._digests.get(operation) == digest:
+                        stats.recordSuccess(latency, len(raw))
+                        return TikoApiResult(outTokens, UNCHANGED)
+                decodeStart = time.perf_counter()
+                response_data = jsonLoads(raw)
+                self.lastDecodeTime = time.perf_counter() - decodeStart
+                stats.recordSuccess(latency, len(raw))
+                _LOGGER.debug(
+                    "Decoded %d bytes in %.2f ms", len(raw), self.lastDecodeTime * 1000
+                )
+                if isAuthError(response_data):
+                    raise TikoAuthError(response_data["errors"])
+                if dedupe and "errors" not in response_data:
+                    self._digests[operation] = digest
 
                 # Return JSON data
-                return [outTokens, response_data]
-
-        except aiohttp.ClientError as e:
-            _LOGGER.error("Request failed: %s", str(e))
-            return None
+                return TikoApiResult(outTokens, response_data)
 
+        except asyncio.TimeoutError as e:
+            _LOGGER.debug("Request timed out")
+            stats.recordTimeout(time.perf_counter() - start)
+            raise TikoApiError("Request timed out", retryable=True) from e
 
-async def login(apiUrl, email, password):
-    """Use login and password to authenticate the user and return tokens."""
-    try:
-        # Prepare POST data
-        variables = {
-            "email": email,
-            "password": password,
-            "langCode": "fr",
-            "retainSession": True,
-        }
-
-        # Call login mutation
-        [reqTokens, data] = await gqlCall(apiUrl, MUTATION_LOGIN, variables)
-
-        if not data:
-            _LOGGER.error("No response data from login request")
-            return False
-
-        if "errors" in data:
-            _LOGGER.error("Login errors: %s", data["errors"])
-            return False
-
-        if (
-            "data" not in data
-            or "logIn" not in data["data"]
-            or data["data"]["logIn"] is None
-        ):
-            _LOGGER.error("Invalid login response structure")
-            return False
+        except aiohttp.ClientError as e:
+            _LOGGER.debug("Request failed: %s", str(e))
+            stats.recordError(time.perf_counter() - start)
+            raise TikoApiError(f"Request failed: {e}", retryable=True) from e
 
-        # Extract and merge user informations
-        tokens = {
-            "account_id": data["data"]["logIn"]["user"]["id"],
-            "token": data["data"]["logIn"]["token"],
-            "member_space": reqTokens.get("member_space"),
-            "csrf_token": reqTokens.get("csrf_token"),
-        }
+        except ValueError as e:
+            _LOGGER.error("Invalid JSON response: %s", str(e))
+            stats.recordError(time.perf_counter() - start)
+            raise TikoApiError(f"Invalid JSON response: {e}") from e
 
-        if not all(tokens.values()):
-            _LOGGER.error("Missing required tokens in response")
+    async def login(self, email, password):
+        """Use login and password to authenticate the user and return tokens."""
+        try:
+            # Prepare POST data
+            variables = {
+                "email": email,
+                "password": password,
+                "langCode": "fr",
+                "retainSession": True,
+            }
+
+            # Call login mutation
+            [reqTokens, data] = await self.gqlCall(MUTATION_LOGIN, variables)
+
+            if not data:
+                _LOGGER.error("No response data from login request")
+                return False
+
+            if "errors" in data:
+                _LOGGER.error("Login errors: %s", data["errors"])
+                return False
+
+            if (
+                "data" not in data
+                or "logIn" not in data["data"]
+                or data["data"]["logIn"] is None
+            ):
+                _LOGGER.error("Invalid login response structure")
+                return False
+
+            # Extract and merge user informations
+            tokens = {
+                "account_id": data["data"]["logIn"]["user"]["id"],
+                "token": data["data"]["logIn"]["token"],
+                "member_space": reqTokens.get("member_space"),
+                "csrf_token": reqTokens.get("csrf_token"),
+            }
+
+            if not all(tokens.values()):
+                _LOGGER.error("Missing required tokens in response")
+                return False
+
+            self.setTokens(tokens)
+            return tokens
+
+        except TikoApiError:
+            raise
+
+        except Exception as error:
+            _LOGGER.error("Login error: %s", error)
             return False
 
-        return tokens
-
-    except Exception as error:
-        _LOGGER.error("Login error: %s", error)
-        return False
-
+    async def getData(self, query=QUERY_GET_DATA):
+        """Fetch all devices informations, return the properties or UNCHANGED.
 
-async def getData(apiUrl, tokens=None):
-    """Fetch all devices informations."""
+        The query may be a buildDataQuery of the room fields in use.
+        """
 
-    # Get data from API
-    [_, data] = await gqlCall(apiUrl, QUERY_GET_DATA, {}, tokens)
-    _LOGGER.info("API::getData: %s", data)
+        # Get data from API
+        [_, data] = await self.gqlCall(query, {}, dedupe=True, operation="get_data")
+        if data is UNCHANGED:
+            return UNCHANGED
+        _LOGGER.debug("API::getData: %s", data)
 
-    return data
+        try:
+            return parseProperties(data)
+        except (KeyError, TypeError) as err:
+            _LOGGER.error("Unexpected data response: %s", data)
+            self.forgetDigest()
+            raise TikoApiError("Unexpected data response") from err
+
+    async def getConsumptionData(self, timestampStart, timestampEnd):
+        """Fetch the consumption of each room between two timestamps (ms)."""
+
+        # Get consumption data from API
+        [_, data] = await self.gqlCall(
+            QUERY_GET_CONSUMPTION_DATA,
+            {
+                "timestampStart": str(timestampStart),
+                "timestampEnd": str(timestampEnd),
+                "resolution": "d",
+            },
+        )
+        _LOGGER.debug("API::getConsumptionData: %s", data)
 
+        try:
+            return parseConsumption(data)
+        except (KeyError, TypeError) as err:
+            _LOGGER.error("Unexpected consumption response: %s", data)
+            raise TikoApiError("Unexpected consumption response") from err
+
+    async def getDataWithConsumption(
+        self, timestampStart, timestampEnd, query=QUERY_GET_DATA_AND_CONSUMPTION
+    ):
+        """Fetch the properties and the room consumption between two timestamps (ms).
+
+        Return the properties and the consumption of each room, None if only the
+        consumption can't be read. The query may be a buildDataQuery of the room
+        fields in use, with the consumption.
+        """
+
+        # Get data and consumption from API in a single request
+        [_, data] = await self.gqlCall(
+            query,
+            {
+                "timestampStart": str(timestampStart),
+                "timestampEnd": str(timestampEnd),
+                "resolution": "d",
+            },
+            operation="get_data_and_consumption",
+        )
+        _LOGGER.debug("API::getDataWithConsumption: %s", data)
 
-async def getConsumptionData(apiUrl, tokens=None):
-    """Fetch all devices consumption informations."""
+        # The next data poll has to be decoded, it may match an older response
+        self.forgetDigest()
 
-    # Get consumption data from API
-    [_, data] = await gqlCall(
-        apiUrl,
-        QUERY_GET_CONSUMPTION_DATA,
-        {
-            "timestampStart": "1609455600000",  # 2021-01-01
-            "timestampEnd": str(int((time.time() + 5 * 60) * 1000)),  # Now + 5 minutes
-            "resolution": "d",
-        },
-        tokens,
-    )
-    _LOGGER.info("API::getConsumptionData: %s", data)
+        try:
+            properties = parseProperties(data)
+        except (KeyError, TypeError) as err:
+            _LOGGER.error("Unexpected data and consumption response: %s", data)
+            raise TikoApiError("Unexpected data and consumption response") from err
 
-    return data
+        # A consumption error must not fail the room data
+        try:
+            consumption = parseConsumption(data)
+        except (KeyError, TypeError):
+            _LOGGER.warning("Unexpected consumption response: %s", data)
+            consumption = None
+
+        return [properties, consumption]
+
+    async def getConsumptionSeries(self, timestampStart, timestampEnd, resolution="h"):
+        """Fetch the consumption of each room between two timestamps (ms).
+
+        Each room also has its consumption for every resolution step of the period.
+        """
+        [_, data] = await self.gqlCall(
+            QUERY_GET_CONSUMPTION_SERIES,
+            {
+                "timestampStart": str(timestampStart),
+                "timestampEnd": str(timestampEnd),
+                "resolution": resolution,
+            },
+        )
+        _LOGGER.debug("API::getConsumptionSeries: %s", data)
 
+        try:
+            return parseConsumption(data)
+        except (KeyError, TypeError) as err:
+            _LOGGER.error("Unexpected consumption series response: %s", data)
+            raise TikoApiError("Unexpected consumption series response") from err
 
-async def setRoomMode(apiUrl, tokens, propertyId, roomId, mode):
-    """Set the room mode."""
+    async def setRoomMode(self, propertyId, roomId, mode):
+        """Set the room mode, return the new mode of the room and its target temperature."""
 
-    # Prepare variables
-    variables = {
-        "propertyId": propertyId,
-        "roomId": roomId,
-        "mode": mode,
-    }
+        # Prepare variables
+        variables = {
+            "propertyId": propertyId,
+            "roomId": roomId,
+            "mode": mode,
+        }
 
-    # Call login mutation
-    [_, data] = await gqlCall(apiUrl, MUTATION_SET_ROOM_MODE, variables, tokens)
-    _LOGGER.info("API::setRoomMode: %s", data)
+        # Call mutation
+        [_, data] = await self.gqlCall(MUTATION_SET_ROOM_MODE, variables)
+        _LOGGER.debug("API::setRoomMode: %s", data)
 
-    return data
+        try:
+            return parseRoomModeResult(data["data"]["activateRoomMode"])
+        except (KeyError, TypeError, AttributeError):
+            _LOGGER.warning("Unexpected room mode response: %s", data)
+            return None
 
+    async def setRoomTemperature(self, propertyId, roomId, temperature):
+        """Set the room temperature, return the adjusted temperature."""
 
-async def setRoomTemperature(apiUrl, tokens, propertyId, roomId, temperature):
-    """Set the room temperature."""
+        # Prepare variables
+        variables = {
+            "propertyId": propertyId,
+            "roomId": roomId,
+            "temperature": temperature,
+        }
 
-    # Prepare variables
-    variables = {
-        "propertyId": propertyId,
-        "roomId": roomId,
-        "temperature": temperature,
-    }
+        # Call mutation
+        [_, data] = await self.gqlCall(MUTATION_SET_ROOM_TEMPERATURE, variables)
+        _LOGGER.debug("API::setRoomTemperature: %s", data)
 
-    # Call login mutation
-    [_, data] = await gqlCall(apiUrl, MUTATION_SET_ROOM_TEMPERATURE, variables, tokens)
-    _LOGGER.info("API::setRoomTemperature: %s", data)
+        try:
+            adjust = data["data"]["setRoomAdjustTemperature"]["adjustTemperature"]
+            return adjust["temperature"] if adjust["active"] else None
+        except (KeyError, TypeError):
+            _LOGGER.warning("Unexpected room temperature response: %s", data)
+            return None
 
-    return data
+    async def setRooms(self, commands):
+        """Send (property id, room id, command, value) commands in a single request.
+
+        Return, for each command, the new mode of the room and its target
+        temperature or the adjusted temperature, None if the command result
+        can't be read.
+        """
+        if len(commands) == 1:
+            [[propertyId, roomId, command, value]] = commands
+            if command == "mode":
+                return [await self.setRoomMode(propertyId, roomId, value)]
+            return [await self.setRoomTemperature(propertyId, roomId, value)]
+
+        # Prepare variables
+        variables = {}
+        for i, (propertyId, roomId, command, value) in enumerate(commands):
+            variables[f"propertyId{i}"] = propertyId
+            variables[f"roomId{i}"] = roomId
+            variables[f"{command}{i}"] = value
+
+        # Call the aliased mutations at once
+        [_, data] = await self.gqlCall(
+            buildRoomsMutation(tuple(command[2] for command in commands)),
+            variables,
+            operation="set_rooms",
+        )
+        _LOGGER.debug("API::setRooms: %s", data)
+
+        results = []
+        for i, (_, roomId, command, _) in enumerate(commands):
+            try:
+                block = data["data"][f"c{i}"]
+                if command == "mode":
+                    results.append(parseRoomModeResult(block))
+                else:
+                    adjust = block["adjustTemperature"]
+                    results.append(adjust["temperature"] if adjust["active"] else None)
+            except (KeyError, TypeError, AttributeError):
+                _LOGGER.warning(
+                    "Unexpected %s response of the room %s: %s",
+                    command,
+                    roomId,
+                    data.get("errors"),
+                )
+                results.append(None)
+        return results
+
+
+class TikoAuthManager:
+    """Authentication shared by every API consumer of a config entry."""
+
+    def __init__(self, client, email, password, onLogin=None):
+        """Auth manager initialization."""
+        self.client = client
+        self._email = email
+        self._password = password
+        self._onLogin = onLogin
+        self._lock = asyncio.Lock()
+
+    async def ensureLogin(self):
+        """Log in if there are no tokens yet and return the tokens."""
+        if self.client.tokens is None:
+            return await self.relogin()
+        return self.client.tokens
+
+    async def relogin(self, staleTokens=None):
+        """Log in again, concurrent callers wait for the same login."""
+        async with self._lock:
+            # Another caller already logged in while we were waiting
+            if self.client.tokens is not None and self.client.tokens is not staleTokens:
+                return self.client.tokens
+
+            tokens = await self.client.login(self._email, self._password)
+            if not tokens:
+                raise TikoAuthError("Unable to login")
+
+            # Let the owner persist the new tokens
+            if self._onLogin is not None:
+                self._onLogin(tokens)
+            return tokens
+
+    async def call(self, method, *args):
+        """Call a client method, logging in again once if the tokens are rejected."""
+        tokens = await self.ensureLogin()
+        try:
+            return await method(*args)
+        except TikoAuthError:
+            _LOGGER.info("Tiko tokens rejected, logging in again")
+            await self.relogin(tokens)
+            return await method(*args)
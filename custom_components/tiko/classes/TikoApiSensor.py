@@ -0,0 +1,91 @@
+import logging
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+
+from ..const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TikoApiSensor(SensorEntity):
+    """A diagnostic sensor exposing the Tiko API instrumentation."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    # Values are read from the in-memory API stats
+    _attr_should_poll = True
+
+    def __init__(self, config_entry, client, type, operation=None):
+        """Sensor initialization."""
+        self._client = client
+        self._type = type
+        self._operation = operation
+
+        if type == "latency":
+            self._attr_name = f"Tiko API {operation.replace('_', ' ')} latency"
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        elif type == "last_success":
+            self._attr_name = "Tiko API last success"
+            self._attr_device_class = SensorDeviceClass.TIMESTAMP
+        else:
+            self._attr_name = f"Tiko API {type}"
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+        if operation is not None:
+            self._attr_unique_id = f"{config_entry.entry_id}_api_{operation}_{type}"
+        else:
+            self._attr_unique_id = f"{config_entry.entry_id}_api_{type}"
+
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, config_entry.entry_id)},
+            "name": "Tiko",
+            "manufacturer": "Tiko",
+            "model": "Tiko API",
+            "sw_version": "1.0",
+        }
+
+    # -------------------------------------------
+    # Helpers
+    # -------------------------------------------
+
+    def _get_stats(self):
+        return [
+            stats
+            for name, stats in self._client.stats.items()
+            if self._operation is None or name == self._operation
+        ]
+
+    # -------------------------------------------
+    # Sensor update
+    # -------------------------------------------
+
+    async def async_update(self):
+        """Read the value of the sensor from the API stats."""
+        stats = self._get_stats()
+        if self._type == "latency":
+            [operation] = stats
+            self._attr_native_value = (
+                round(operation.lastLatency * 1000, 1)
+                if operation.lastLatency is not None
+                else None
+            )
+            self._attr_extra_state_attributes = operation.asDict()
+        elif self._type == "calls":
+            self._attr_native_value = sum(operation.calls for operation in stats)
+        elif self._type == "errors":
+            self._attr_native_value = sum(operation.errors for operation in stats)
+        elif self._type == "timeouts":
+            self._attr_native_value = sum(operation.timeouts for operation in stats)
+        elif self._type == "last_success":
+            successes = [
+                operation.lastSuccess for operation in stats if operation.lastSuccess
+            ]
+            self._attr_native_value = max(successes) if successes else None
@@ -8,249 +8,135 @@ from homeassistant.components.climate.const import (
     HVACMode,
 )
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.core import callback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from ..const import DOMAIN
+from .TikoRoomEntity import TikoRoomEntity
 
 PRESET_NIGHT = "night"
 PRESET_FROST = "frost"
 
 
-class TikoClimate(CoordinatorEntity, ClimateEntity):
+class TikoClimate(TikoRoomEntity, ClimateEntity):
     """A climate for the Tiko integration."""
 
-    def __init__(self, coordinator, property_id, room):
-        """Climate initialization."""
-        super().__init__(coordinator)
-        self._attr_translation_key = "tiko"
-        self._room = room
-        self._property_id = property_id
-        self._coordinator = coordinator
-
-    # -------------------------------------------
-    # Helpers
-    # -------------------------------------------
-
-    def _get_room_data(self):
-        if self._coordinator.data is not None:
-            for prop in self._coordinator.data["data"]["properties"]:
-                if prop["id"] == self._property_id:
-                    for room in prop["rooms"]:
-                        if room["id"] == self._room["id"]:
-                            return room
-        return None
-
     # -------------------------------------------
-    # Global entity attributes
+    # Static climate attributes
     # -------------------------------------------
 
-    @property
-    def name(self):
-        """Returns the name of the climate."""
-        return self._room["name"]
+    _attr_translation_key = "tiko"
+    _attr_supported_features = (
+        ClimateEntityFeature.TURN_ON
+        | ClimateEntityFeature.TURN_OFF
+        | ClimateEntityFeature.TARGET_TEMPERATURE
+        | ClimateEntityFeature.PRESET_MODE
+    )
 
-    @property
-    def unique_id(self):
-        """Returns the unique ID of the climate."""
-        return f"{self._property_id}_{self._room['id']}_climate"
-
-    @property
-    def device_info(self):
-        """Returns device information."""
-        return {
-            "identifiers": {(DOMAIN, self._room["id"])},
-            "name": self._room["name"],
-            "manufacturer": "Tiko",
-            "model": "Tiko Equipment",
-            "sw_version": "1.0",
-        }
+    # Add HVACMode.AUTO if we have schedule temperatures? See status.temporaryAdjustment
+    _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
+    _attr_preset_modes = [
+        PRESET_NONE,
+        PRESET_COMFORT,
+        PRESET_ECO,
+        PRESET_NIGHT,
+        PRESET_FROST,
+    ]
+    _attr_max_humidity = 100
+    _attr_min_humidity = 1
+    _attr_max_temp = 40
+    _attr_min_temp = 1
+    _attr_precision = 0.1
+    _attr_target_temperature_step = 0.1
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+
+    # Not supported by Tiko
+    _attr_fan_mode = None
+    _attr_fan_modes = None
+    _attr_swing_mode = None
+    _attr_swing_modes = None
+    _attr_target_humidity = None
+    _attr_target_temperature_high = None
+    _attr_target_temperature_low = None
 
-    @property
-    def supported_features(self):
-        """Return the list of supported features."""
-        return (
-            ClimateEntityFeature.TURN_ON
-            | ClimateEntityFeature.TURN_OFF
-            | ClimateEntityFeature.TARGET_TEMPERATURE
-            | ClimateEntityFeature.PRESET_MODE
-        )
+    def __init__(self, coordinator, property_id, room):
+        """Climate initialization."""
+        super().__init__(coordinator, property_id, room)
+        self._attr_name = room.name
+        self._attr_unique_id = f"{property_id}_{room.id}_climate"
+        self._update_attrs()
 
     # -------------------------------------------
     # Climate attributes
     # -------------------------------------------
 
-    @property
-    def current_humidity(self):
-        """Return the current humidity."""
-        room = self._get_room_data()
-        return room["humidity"] if room is not None else None
-
-    @property
-    def current_temperature(self):
-        """Return the current temperature."""
-        room = self._get_room_data()
-        return room["currentTemperatureDegrees"] if room is not None else None
-
-    @property
-    def fan_mode(self):
-        """Return the fan setting."""
-        return None
-
-    @property
-    def fan_modes(self):
-        """Return the list of available fan modes."""
-        return None
-
-    @property
-    def hvac_action(self):
-        """Return the current HVAC action."""
-        room = self._get_room_data()
-        if room is not None:
-            if room["status"]["heatingOperating"]:
-                return HVACAction.HEATING
-            if room["mode"]["disableHeating"]:
-                return HVACAction.OFF
-            return HVACAction.IDLE
-        return None
-
-    @property
-    def hvac_mode(self):
-        """Return the current operation mode."""
-        room = self._get_room_data()
-        if room is not None:
-            if room["mode"]["disableHeating"]:
-                return HVACMode.OFF
-            return HVACMode.HEAT
-        return None
-
-    # Add HVACMode.AUTO if we have schedule temperatures? See status.temporaryAdjustment
-
-    @property
-    def hvac_modes(self):
-        """Return the list of available HVAC operation modes."""
-        return [HVACMode.OFF, HVACMode.HEAT]
-
-    @property
-    def max_humidity(self):
-        """Return the maximum humidity."""
-        return 100
-
-    @property
-    def max_temp(self):
-        """Return the maximum temperature."""
-        return 40
-
-    @property
-    def min_humidity(self):
-        """Return the minimum humidity."""
-        return 1
-
-    @property
-    def min_temp(self):
-        """Return the minimum temperature."""
-        return 1
-
-    @property
-    def precision(self):
-        """Return the precision of the temperature."""
-        return 0.1
-
-    @property
-    def preset_mode(self):
-        """Return the current preset mode."""
+    def _update_attrs(self):
+        """Compute the climate attributes from the room."""
         room = self._get_room_data()
-        if room is not None:
-            if room["mode"]["disableHeating"]:
-                return PRESET_NONE
-            if room["mode"]["comfort"]:
-                return PRESET_COMFORT
-            if room["mode"]["absence"]:
-                return PRESET_ECO
-            if room["mode"]["sleep"]:
-                return PRESET_NIGHT
-            if room["mode"]["frost"]:
-                return PRESET_FROST
-        return PRESET_NONE
-
-    @property
-    def preset_modes(self):
-        """Return the list of available preset modes."""
-        return [PRESET_NONE, PRESET_COMFORT, PRESET_ECO, PRESET_NIGHT, PRESET_FROST]
-
-    @property
-    def swing_mode(self):
-        """Return the swing setting."""
-        return None  # Not supported by Tiko
-
-    @property
-    def swing_modes(self):
-        """Return the swing modes."""
-        return None  # Not supported by Tiko
-
-    @property
-    def target_humidity(self):
-        """Return the humidity we try to reach."""
-        return None  # Not supported by Tiko
+        if room is None:
+            self._attr_current_humidity = None
+            self._attr_current_temperature = None
+            self._attr_hvac_action = None
+            self._attr_hvac_mode = None
+            self._attr_preset_mode = PRESET_NONE
+            self._attr_target_temperature = None
+            return
+
+        self._attr_current_humidity = room.humidity
+        self._attr_current_temperature = room.currentTemperatureDegrees
+
+        if room.status.heatingOperating:
+            self._attr_hvac_action = HVACAction.HEATING
+        elif room.mode.disableHeating:
+            self._attr_hvac_action = HVACAction.OFF
+        else:
+            self._attr_hvac_action = HVACAction.IDLE
+
+        self._attr_hvac_mode = (
+            HVACMode.OFF if room.mode.disableHeating else HVACMode.HEAT
+        )
 
-    @property
-    def target_temperature(self):
-        """Return the temperature we try to reach."""
-        room = self._get_room_data()
-        return (
-            room["targetTemperatureDegrees"]
-            if room is not None and room["targetTemperatureDegrees"] > 0
+        if room.mode.disableHeating:
+            self._attr_preset_mode = PRESET_NONE
+        elif room.mode.comfort:
+            self._attr_preset_mode = PRESET_COMFORT
+        elif room.mode.absence:
+            self._attr_preset_mode = PRESET_ECO
+        elif room.mode.sleep:
+            self._attr_preset_mode = PRESET_NIGHT
+        elif room.mode.frost:
+            self._attr_preset_mode = PRESET_FROST
+        else:
+            self._attr_preset_mode = PRESET_NONE
+
+        self._attr_target_temperature = (
+            room.targetTemperatureDegrees
+            if room.targetTemperatureDegrees is not None
+            and room.targetTemperatureDegrees > 0
             else None
         )
 
-    @property
-    def target_temperature_high(self):
-        """Return the highbound target temperature we try to reach."""
-        return None  # Not supported by Tiko
-
-    @property
-    def target_temperature_low(self):
-        """Return the lowerbound target temperature we try to reach."""
-        return None  # Not supported by Tiko
-
-    @property
-    def target_temperature_step(self):
-        """Return the supported step of target temperature."""
-        return 0.1
-
-    @property
-    def temperature_unit(self):
-        """Return the unit of measurement."""
-        return UnitOfTemperature.CELSIUS
-
     # -------------------------------------------
     # Climate methods
     # -------------------------------------------
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
-        room = self._get_room_data()
 
-        if self._room is not None:
-            # Disable it
-            if hvac_mode == HVACMode.OFF:
-                await self._coordinator.set_room_mode(
-                    self._property_id, room["id"], "disableHeating"
-                )
+        # Disable it
+        if hvac_mode == HVACMode.OFF:
+            self._coordinator.queue_room_mode(
+                self._property_id, self._room_id, "disableHeating"
+            )
 
-            # Enable it
-            if hvac_mode == HVACMode.HEAT:
-                await self._coordinator.set_room_mode(
-                    self._property_id, room["id"], None
-                )
+        # Enable it
+        if hvac_mode == HVACMode.HEAT:
+            self._coordinator.queue_room_mode(self._property_id, self._room_id, None)
 
     async def async_turn_on(self):
         """Turn the entity on."""
-        return self.async_set_hvac_mode(HVACMode.HEAT)
+        await self.async_set_hvac_mode(HVACMode.HEAT)
 
     async def async_turn_off(self):
         """Turn the entity off."""
-        return self.async_set_hvac_mode(HVACMode.OFF)
+        await self.async_set_hvac_mode(HVACMode.OFF)
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new target preset mode."""
@@ -265,24 +151,27 @@ class TikoClimate(CoordinatorEntity, ClimateEntity):
         elif preset_mode == PRESET_FROST:
             value = "frost"
 
-        await self._coordinator.set_room_mode(
-            self._property_id, self._room["id"], value
-        )
+        self._coordinator.queue_room_mode(self._property_id, self._room_id, value)
+
+    async def async_set_room(self, **kwargs):
+        """Queue a mode and/or temperature change of the room (tiko.set_rooms).
+
+        The mode is a Tiko room mode, None to heat without a mode.
+        """
+        if "mode" in kwargs:
+            self._coordinator.queue_room_mode(
+                self._property_id, self._room_id, kwargs["mode"]
+            )
+        if ATTR_TEMPERATURE in kwargs:
+            self._coordinator.queue_room_temperature(
+                self._property_id, self._room_id, kwargs[ATTR_TEMPERATURE]
+            )
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         if ATTR_TEMPERATURE in kwargs:
-            await self._coordinator.set_room_temperature(
+            self._coordinator.queue_room_temperature(
                 self._property_id,
-                self._room["id"],
+                self._room_id,
                 kwargs[ATTR_TEMPERATURE],
             )
-
-    # -------------------------------------------
-    # Coordinator refresh
-    # -------------------------------------------
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
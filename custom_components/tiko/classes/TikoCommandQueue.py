@@ -0,0 +1,130 @@
+import logging
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+# Changes made within this delay (seconds) are sent together, the last value of a
+# room wins
+COMMAND_DELAY = 1.5
+
+# Commands are sent at the latest this delay (seconds) after the first one queued
+COMMAND_MAX_DELAY = 5
+
+
+class TikoCommandQueue:
+    """Queue merging rapid thermostat changes of every room into a single API call."""
+
+    def __init__(self, hass, coordinator):
+        """Queue initialization."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._pending = {}
+        self._inflight = {}
+        self._timer = None
+        self._first_queued = None
+
+        # Commands confirmed by the API, kept until a refresh started after their
+        # confirmation, with the number of refreshes started when confirmed
+        self._confirmed = {}
+        self._refreshes = 0
+
+    @callback
+    def enqueue(self, propertyId, roomId, command, value):
+        """Queue a command of a room and restart the delay."""
+        key = (propertyId, roomId)
+        now = time.monotonic()
+        if not self._pending:
+            self._first_queued = now
+        self._pending.setdefault(key, {})[command] = value
+
+        # Restart the delay, the rooms changed meanwhile are sent together, but
+        # a steady stream of changes doesn't hold the batch back forever
+        delay = min(COMMAND_DELAY, max(0, self._first_queued + COMMAND_MAX_DELAY - now))
+        if self._timer is not None:
+            self._timer()
+        self._timer = async_call_later(self._hass, delay, self._async_send)
+
+    def get_commands(self, key):
+        """Return the commands of a room that a fetched data may not reflect yet."""
+        return {
+            **self._confirmed.get(key, ({}, None))[0],
+            **self._inflight.get(key, {}),
+            **self._pending.get(key, {}),
+        }
+
+    def items(self):
+        """Return the commands of every room that a fetched data may not reflect yet."""
+        keys = self._confirmed.keys() | self._inflight.keys() | self._pending.keys()
+        return [(key, self.get_commands(key)) for key in keys]
+
+    def refresh_started(self):
+        """Return the number of the refresh starting."""
+        self._refreshes += 1
+        return self._refreshes
+
+    def refresh_done(self, refresh):
+        """Forget the commands confirmed before the start of a completed refresh."""
+        self._confirmed = {
+            key: (commands, confirmedAt)
+            for key, (commands, confirmedAt) in self._confirmed.items()
+            if confirmedAt >= refresh
+        }
+
+    @callback
+    def async_cancel(self):
+        """Drop the commands that were not sent yet."""
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+        self._pending.clear()
+        self._confirmed.clear()
+
+    async def async_flush(self):
+        """Send the queued commands without waiting for the delay."""
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+        await self._async_send(None)
+
+    async def _async_send(self, _now):
+        """Send the merged commands of every room in a single request."""
+        self._timer = None
+        commands = self._pending
+        self._pending = {}
+        if not commands:
+            return
+
+        self._inflight.update(commands)
+        try:
+            unpatched = await self._coordinator.set_rooms(commands)
+        except Exception as err:
+            _LOGGER.error(
+                "Unable to update the rooms %s: %s",
+                ", ".join(str(roomId) for [_, roomId] in commands),
+                err,
+            )
+            unpatched = commands.keys()
+        finally:
+            for key, roomCommands in commands.items():
+                if self._inflight.get(key) is roomCommands:
+                    self._inflight.pop(key)
+
+        # A refresh started before the confirmation may still return the old values
+        for key, roomCommands in commands.items():
+            room = self._coordinator.get_room(*key)
+            if key in unpatched or room is None:
+                continue
+            confirmed = dict(roomCommands)
+            if room.targetTemperatureDegrees is not None:
+                confirmed["temperature"] = room.targetTemperatureDegrees
+            self._confirmed[key] = (confirmed, self._refreshes)
+
+        # The room data was patched from the responses, no need to fetch everything
+        if not unpatched:
+            return
+
+        # One refresh once every burst settled
+        await self._coordinator.async_request_refresh()
@@ -1,47 +1,254 @@
 from datetime import timedelta
 import logging
+import time
 
 import async_timeout
 
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from ..const import CONF_API_URL
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from ..api import getConsumptionData, login
+from ..api import TikoApiError, TikoAuthError
+from ..const import (
+    CONSUMPTION_STORAGE_KEY,
+    FETCH_TIMEOUT,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .TikoRoomChanges import TikoRoomChanges
 
 _LOGGER = logging.getLogger(__name__)
 
+# First backfill starts here
+BACKFILL_START = 1609455600000  # 2021-01-01
 
-class TikoConsumptionDataUpdateCoordinator(DataUpdateCoordinator):
+# A day is folded into the totals only once Tiko had time to publish its last values
+FOLD_DELAY = timedelta(hours=1)
+
+
+class TikoConsumptionDataUpdateCoordinator(TikoRoomChanges, DataUpdateCoordinator):
     """Tiko consumption data coordinator."""
 
-    def __init__(self, hass, config_entry):
+    def __init__(self, hass, config_entry, auth, dataCoordinator):
         """Initialize my coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name="TikoConsumptionDataUpdateCoordinator",
             update_interval=timedelta(seconds=300),
-            always_update=True,
+            always_update=False,
         )
         self._config_entry = config_entry
-        self._credentials = None
-        self._data = None
-        self._apiUrl = self._config_entry.data.get(CONF_API_URL, None)
+        self._auth = auth
+        self._client = auth.client
+
+        # The room data is refreshed along with the consumption of the current day
+        self._dataCoordinator = dataCoordinator
+        self._store = Store(
+            hass,
+            STORAGE_VERSION,
+            CONSUMPTION_STORAGE_KEY.format(config_entry.entry_id),
+        )
+
+        # Per room consumption (Wh) of the complete days before the watermark (ms)
+        self._totals = None
+        self._watermark = BACKFILL_START
+
+        self._init_room_changes()
+
+        # Refresh started outside of the schedule, and last successful refresh
+        self._refresh_task = None
+        self._refreshed_at = None
+
+        # The setup refresh runs along with the first room data refresh
+        self._startup = False
+
+    # -------------------------------------------
+    # Helpers
+    # -------------------------------------------
+
+    @staticmethod
+    def _decode(values):
+        """Convert stored per room values to (property id, room id) keys."""
+        decoded = {}
+        for key, value in values.items():
+            [propertyId, roomId] = key.split("_")
+            decoded[(int(propertyId), int(roomId))] = value
+        return decoded
+
+    @staticmethod
+    def _encode(values):
+        """Convert per room values to a storable mapping."""
+        return {
+            f"{propertyId}_{roomId}": value
+            for (propertyId, roomId), value in values.items()
+        }
+
+    @staticmethod
+    def _to_map(roomsConsumption):
+        """Index the consumption (Wh) of each room by (property id, room id)."""
+        return {
+            (room.propertyId, room.id): room.energyWh for room in roomsConsumption
+        }
+
+    def has_enabled_entities(self):
+        """Return True if a consumption entity is, or will be, enabled."""
+        entries = [
+            entry
+            for entry in er.async_entries_for_config_entry(
+                er.async_get(self.hass), self._config_entry.entry_id
+            )
+            if entry.unique_id.endswith("_consumption")
+        ]
+
+        # Not registered yet, the entities will be created enabled
+        if not entries:
+            return True
+        return any(entry.disabled_by is None for entry in entries)
+
+    @property
+    def is_polling(self):
+        """Return True while an entity listens to the consumption."""
+        return bool(self._listeners)
+
+    def _is_stale(self):
+        """Return True if the consumption was not refreshed during the last interval."""
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at
+            >= self.update_interval.total_seconds()
+        )
+
+    @callback
+    def _async_start_refresh(self):
+        """Refresh in background, unless a refresh is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = self._config_entry.async_create_background_task(
+                self.hass, self.async_refresh(), "tiko_consumption_refresh"
+            )
+
+    async def async_load_snapshot(self):
+        """Load the running totals and seed the last known consumption."""
+        stored = await self._store.async_load()
+        self._totals = {}
+        if not stored:
+            return False
+
+        self._watermark = stored["watermark"]
+        self._totals = self._decode(stored["totals"])
+        if not stored.get("data"):
+            return False
+
+        self.async_set_updated_data(self._decode(stored["data"]))
+        return True
+
+    def _data_to_store(self):
+        """Return the data to persist."""
+        return {
+            "watermark": self._watermark,
+            "totals": self._encode(self._totals),
+            "data": self._encode(self.data or {}),
+        }
+
+    async def _async_fetch(self, timestampStart, timestampEnd):
+        """Return the consumption (Wh) of each room between two timestamps."""
+        try:
+            roomsConsumption = await self._auth.call(
+                self._client.getConsumptionData, timestampStart, timestampEnd
+            )
+        except TikoAuthError as err:
+            raise UpdateFailed(f"Authentication failed: {err}") from err
+        except TikoApiError as err:
+            raise UpdateFailed(
+                f"Error communicating with the Tiko API: {err}"
+            ) from err
+
+        return self._to_map(roomsConsumption)
+
+    async def _async_fetch_with_data(self, timestampStart, timestampEnd):
+        """Return the consumption (Wh) of each room, refreshing the room data too."""
+        roomsConsumption = await self._dataCoordinator.async_refresh_with_consumption(
+            timestampStart, timestampEnd
+        )
+        if roomsConsumption is None and not self._dataCoordinator.last_update_success:
+            raise UpdateFailed(
+                "Unable to fetch the consumption: "
+                f"{self._dataCoordinator.last_exception}"
+            )
+        if roomsConsumption is None:
+            raise UpdateFailed("Unexpected consumption response")
+
+        return self._to_map(roomsConsumption)
+
+    # -------------------------------------------
+    # Coordinator refresh
+    # -------------------------------------------
+
+    @callback
+    def async_start(self):
+        """Start the first refresh if a consumption entity is enabled."""
+        if not self.has_enabled_entities():
+            _LOGGER.debug("No consumption entity enabled, consumption not polled")
+            return
+        self._startup = True
+        self._async_start_refresh()
+
+    @callback
+    def async_add_listener(self, update_callback, context=None):
+        """Subscribe an entity, the first one starts the consumption polling.
+
+        The polling stops by itself once the last entity unsubscribes.
+        """
+        start = not self._listeners
+        remove = super().async_add_listener(update_callback, context)
+        if start and self._is_stale():
+            self._async_start_refresh()
+        return remove
 
     async def _async_update_data(self):
-        """Fetch data from API endpoint."""
-        async with async_timeout.timeout(10):
-            if self._credentials is None:
-                self._credentials = await login(
-                    self._apiUrl,
-                    self._config_entry.data[CONF_USERNAME],
-                    self._config_entry.data[CONF_PASSWORD],
-                )
-
-            newData = await getConsumptionData(self._apiUrl, self._credentials)
-            self.async_set_updated_data(newData)
-            if newData is not None:
-                self._data = newData
-
-            return self._data
+        """Fetch the consumption since the watermark and add it to the totals."""
+        async with async_timeout.timeout(FETCH_TIMEOUT):
+            if self._totals is None:
+                await self.async_load_snapshot()
+
+            # Fold the days completed since the last watermark into the totals
+            dayStart = int(
+                dt_util.start_of_local_day(dt_util.now() - FOLD_DELAY).timestamp()
+                * 1000
+            )
+            if self._watermark < dayStart:
+                completed = await self._async_fetch(self._watermark, dayStart)
+                totals = dict(self._totals)
+                for key, value in completed.items():
+                    totals[key] = totals.get(key, 0) + value
+                self._totals = totals
+                self._watermark = dayStart
+                await self._store.async_save(self._data_to_store())
+
+            # Consumption of the current day, with the room data in the same request
+            # unless the room data is being refreshed anyway
+            fetch = self._async_fetch_with_data
+            if self._startup or self._dataCoordinator.is_refreshing:
+                fetch = self._async_fetch
+            self._startup = False
+            current = await fetch(
+                self._watermark,
+                int((dt_util.utcnow() + timedelta(minutes=5)).timestamp() * 1000),
+            )
+
+            data = {
+                key: self._totals.get(key, 0) + current.get(key, 0)
+                for key in self._totals.keys() | current.keys()
+            }
+
+            # Diff each room against the previous snapshot
+            self._diff_rooms(self.data, data)
+
+            # Persist the last known consumption
+            if self._changed_rooms is None or self._changed_rooms:
+                self._store.async_delay_save(self._data_to_store, SNAPSHOT_SAVE_DELAY)
+
+            self._refreshed_at = time.monotonic()
+            return data
@@ -1,69 +1,474 @@
-from datetime import timedelta
+import asyncio
+from dataclasses import replace
 import logging
+import random
+import time
 
 import async_timeout
 
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from ..const import CONF_API_URL
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from ..api import getData, login, setRoomMode, setRoomTemperature
+from homeassistant.util import dt as dt_util
+
+from ..api import UNCHANGED, TikoApiError, TikoAuthError
+from ..const import (
+    COMMAND_UPDATE_WINDOW,
+    DOMAIN,
+    FAST_UPDATE_INTERVAL,
+    HEATING_UPDATE_INTERVAL,
+    FETCH_TIMEOUT,
+    MAX_BACKOFF_INTERVAL,
+    SLOW_UPDATE_INTERVAL,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_KEY,
+    STABLE_REFRESHES,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+)
+from ..models import parseProperties, propertiesToDict
+from ..queries import ENTITY_ROOM_FIELDS, buildDataQuery, roomFields
+from .TikoCommandQueue import TikoCommandQueue
+from .TikoRoomChanges import TikoRoomChanges
 
 _LOGGER = logging.getLogger(__name__)
 
+# Failures from which the backoff interval stops doubling
+MAX_BACKOFF_EXPONENT = 6
+
+# Refresh requested after commands waits this delay (seconds) for other commands
+REFRESH_DELAY = 3
+
+ROOM_MODES = ("comfort", "absence", "frost", "sleep", "disableHeating")
+
+# Entity type of the room entities, from their unique id suffix
+ENTITY_TYPE_SUFFIXES = {
+    f"_{entityType}": entityType for entityType in ENTITY_ROOM_FIELDS
+}
+
 
-class TikoDataUpdateCoordinator(DataUpdateCoordinator):
+class TikoDataUpdateCoordinator(TikoRoomChanges, DataUpdateCoordinator):
     """Tiko data coordinator."""
 
-    def __init__(self, hass, config_entry):
+    def __init__(self, hass, config_entry, auth):
         """Initialize my coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name="TikoDataUpdateCoordinator",
-            update_interval=timedelta(seconds=30),
-            always_update=True,
+            update_interval=UPDATE_INTERVAL,
+            always_update=False,
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REFRESH_DELAY, immediate=False
+            ),
         )
         self._config_entry = config_entry
-        self._credentials = None
+        self._auth = auth
+        self._client = auth.client
         self._data = None
-        self._apiUrl = self._config_entry.data.get(CONF_API_URL, None)
+        self._rooms = {}
+
+        # Last known data, used at startup
+        self._snapshot = Store(
+            hass,
+            STORAGE_VERSION,
+            SNAPSHOT_STORAGE_KEY.format(config_entry.entry_id),
+        )
+
+        # Last time the API answered
+        self.last_seen = None
+
+        self._init_room_changes()
+
+        # Thermostat changes waiting to be sent
+        self._commands = TikoCommandQueue(hass, self)
+
+        # Polling scheduler state
+        self._failures = 0
+        self._stable_refreshes = 0
+        self._last_command = None
+
+        # Consumption period (ms) fetched along with the next refresh, and its result
+        self._consumption_window = None
+        self._consumption = None
+
+        # Refresh in flight, joined by the refreshes requested meanwhile
+        self._refreshing = None
+        self.joined_refreshes = 0
+
+        # Room fields read by the enabled entities, and the entities of the entry
+        self._fields = None
+        self._entity_ids = set()
+        self._async_update_fields()
+        self._unsub_registry = hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            self._async_registry_updated,
+            event_filter=self._async_registry_filter,
+        )
+
+    async def async_load_snapshot(self):
+        """Seed the coordinator with the last known data, return False if there is none."""
+        stored = await self._snapshot.async_load()
+        if not stored:
+            return False
+
+        try:
+            data = parseProperties(stored)
+        except (KeyError, TypeError):
+            _LOGGER.warning("Ignoring invalid Tiko snapshot")
+            return False
+
+        self._data = data
+        self._rooms = self._build_rooms_index(data)
+        self.async_set_updated_data(data)
+        return True
 
     async def _async_update_data(self):
+        """Fetch data from API endpoint and schedule the next poll."""
+        try:
+            data = await self._async_fetch_data()
+        except Exception:
+            self._failures += 1
+            self.update_interval = self._compute_update_interval()
+            raise
+
+        self._failures = 0
+        if self._changed_rooms is not None and not self._changed_rooms:
+            self._stable_refreshes += 1
+        else:
+            self._stable_refreshes = 0
+        self.update_interval = self._compute_update_interval()
+
+        return data
+
+    async def _async_fetch_data(self):
         """Fetch data from API endpoint."""
-        async with async_timeout.timeout(10):
-            if self._credentials is None:
-                self._credentials = await login(
-                    self._apiUrl,
-                    self._config_entry.data[CONF_USERNAME],
-                    self._config_entry.data[CONF_PASSWORD],
-                )
+        async with async_timeout.timeout(FETCH_TIMEOUT):
+            refresh = self._commands.refresh_started()
+            try:
+                if self._consumption_window is None:
+                    newData = await self._auth.call(
+                        self._client.getData, buildDataQuery(self._fields)
+                    )
+                else:
+                    [newData, self._consumption] = await self._auth.call(
+                        self._client.getDataWithConsumption,
+                        *self._consumption_window,
+                        buildDataQuery(self._fields, consumption=True),
+                    )
+            except TikoAuthError as err:
+                raise UpdateFailed(f"Authentication failed: {err}") from err
+            except TikoApiError as err:
+                raise UpdateFailed(
+                    f"Error communicating with the Tiko API: {err}"
+                ) from err
+            self.last_seen = dt_util.utcnow()
+
+            # Same response as the previous poll, nothing to parse nor dispatch
+            if newData is UNCHANGED and self._data is not None:
+                self._changed_rooms = set() if self.last_update_success else None
+                return self._data
+            if newData is UNCHANGED:
+                self._client.forgetDigest()
+                raise UpdateFailed("Unchanged data received before any data")
+
+            rooms = self._build_rooms_index(newData)
+
+            # Keep the commands the API data may not reflect yet on top of it
+            self._commands.refresh_done(refresh)
+            for key, commands in self._commands.items():
+                if key in rooms:
+                    self._apply_commands(rooms[key], commands)
 
-            newData = await getData(self._apiUrl, self._credentials)
-            self.async_set_updated_data(newData)
-            if newData is not None:
-                self._data = newData
+            # Diff each room against the previous snapshot
+            self._diff_rooms(self._rooms if self._data is not None else None, rooms)
+
+            # Rooms gone from the account, an empty account is not trusted
+            removed = self._rooms.keys() - rooms.keys() if rooms else set()
+
+            self._data = newData
+            self._rooms = rooms
+            if removed:
+                self._async_remove_rooms(removed)
+
+            # Persist the last known data
+            if self._changed_rooms is None or self._changed_rooms:
+                self._snapshot.async_delay_save(
+                    lambda: propertiesToDict(self._data), SNAPSHOT_SAVE_DELAY
+                )
 
             return self._data
 
-    async def set_room_mode(self, propertyId, roomId, mode):
-        """Set the room mode."""
-        await setRoomMode(
-            self._apiUrl,
-            self._credentials,
-            propertyId,
-            roomId,
-            mode,
+    async def _async_refresh(self, *args, **kwargs):
+        """Refresh the data, or wait for the refresh in flight.
+
+        Polls, command refreshes and consumption ticks asking for a refresh at
+        the same time share a single request and a single listeners dispatch.
+        """
+        if self._refreshing is not None:
+            self.joined_refreshes += 1
+            await asyncio.shield(self._refreshing)
+            return
+
+        self._refreshing = self.hass.loop.create_future()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            self._refreshing.set_result(None)
+            self._refreshing = None
+
+    @property
+    def is_refreshing(self):
+        """Return True while a refresh is in flight."""
+        return self._refreshing is not None
+
+    @property
+    def failures(self):
+        """Return the number of consecutive failed refreshes."""
+        return self._failures
+
+    @property
+    def room_count(self):
+        """Return the number of rooms of the last refresh."""
+        return len(self._rooms)
+
+    async def async_refresh_with_consumption(self, timestampStart, timestampEnd):
+        """Refresh the data and fetch the room consumption in a single request.
+
+        Return the consumption of each room between two timestamps (ms), None if
+        the refresh failed.
+        """
+        # A refresh in flight doesn't fetch the consumption, don't join it
+        while self._refreshing is not None:
+            await asyncio.shield(self._refreshing)
+
+        self._consumption_window = (timestampStart, timestampEnd)
+        self._consumption = None
+        try:
+            await self.async_refresh()
+        finally:
+            self._consumption_window = None
+
+        consumption = self._consumption
+        self._consumption = None
+        return consumption
+
+    def _compute_update_interval(self):
+        """Return the delay before the next poll from the heating activity and API health."""
+
+        # Exponential backoff with jitter while the API fails, the exponent is capped
+        # as the interval would overflow during long outages
+        if self._failures:
+            delay = min(
+                MAX_BACKOFF_INTERVAL,
+                UPDATE_INTERVAL * 2 ** min(self._failures, MAX_BACKOFF_EXPONENT),
+            )
+            return delay * random.uniform(0.75, 1.25)
+
+        # Follow the effect of a user command closely
+        if (
+            self._last_command is not None
+            and time.monotonic() - self._last_command < COMMAND_UPDATE_WINDOW
+        ):
+            return FAST_UPDATE_INTERVAL
+
+        rooms = self._rooms.values()
+        if any(room.status.heatingOperating for room in rooms):
+            return HEATING_UPDATE_INTERVAL
+
+        # Nothing moves or heating is disabled everywhere
+        if self._stable_refreshes >= STABLE_REFRESHES or all(
+            room.mode.disableHeating for room in rooms
+        ):
+            return SLOW_UPDATE_INTERVAL
+
+        return UPDATE_INTERVAL
+
+    @callback
+    def _async_command_queued(self):
+        """Poll faster after a user command."""
+        self._last_command = time.monotonic()
+        if self.update_interval != FAST_UPDATE_INTERVAL and not self._failures:
+            self.update_interval = FAST_UPDATE_INTERVAL
+            self._schedule_refresh()
+
+    @staticmethod
+    def _build_rooms_index(data):
+        """Index the rooms of every property by (property id, room id)."""
+        rooms = {}
+        for prop in data:
+            for room in prop.rooms:
+                rooms[(prop.id, room.id)] = room
+        return rooms
+
+    @callback
+    def _async_update_fields(self):
+        """Select the room fields to fetch from the enabled entities."""
+        entries = er.async_entries_for_config_entry(
+            er.async_get(self.hass), self._config_entry.entry_id
         )
-        await self.async_refresh()
-
-    async def set_room_temperature(self, propertyId, roomId, temperature):
-        """Set the room temperature."""
-        await setRoomTemperature(
-            self._apiUrl,
-            self._credentials,
-            propertyId,
-            roomId,
-            temperature,
+        self._entity_ids = {entry.entity_id for entry in entries}
+        entityTypes = set()
+        for entry in entries:
+            for suffix, entityType in ENTITY_TYPE_SUFFIXES.items():
+                if entry.unique_id.endswith(suffix) and entry.disabled_by is None:
+                    entityTypes.add(entityType)
+
+        # Nothing registered yet, every entity will be created enabled
+        if not entries:
+            entityTypes = set(ENTITY_ROOM_FIELDS)
+
+        fields = roomFields(entityTypes)
+        if fields != self._fields:
+            _LOGGER.debug("Fetching the room fields %s", sorted(fields))
+            self._fields = fields
+            self._client.forgetDigest()
+
+    @callback
+    def _async_registry_filter(self, event):
+        """Return True if the registry event is about an entity of this entry."""
+        if event.data["action"] == "create":
+            entry = er.async_get(self.hass).async_get(event.data["entity_id"])
+            return (
+                entry is not None
+                and entry.config_entry_id == self._config_entry.entry_id
+            )
+        return (
+            event.data["entity_id"] in self._entity_ids
+            or event.data.get("old_entity_id") in self._entity_ids
         )
-        await self.async_refresh()
+
+    @callback
+    def _async_registry_updated(self, event):
+        """Follow the entities being enabled, disabled or removed."""
+        if event.data["action"] != "update" or "disabled_by" in event.data.get(
+            "changes", {}
+        ):
+            self._async_update_fields()
+        elif "old_entity_id" in event.data:
+            self._entity_ids.discard(event.data["old_entity_id"])
+            self._entity_ids.add(event.data["entity_id"])
+
+    def get_room(self, propertyId, roomId):
+        """Return the last known data of a room."""
+        return self._rooms.get((propertyId, roomId))
+
+    def get_rooms(self):
+        """Return the last known rooms by (property id, room id)."""
+        return self._rooms
+
+    @callback
+    def _async_remove_rooms(self, keys):
+        """Remove the devices, and their entities, of rooms gone from the account."""
+        registry = dr.async_get(self.hass)
+        for [_, roomId] in keys:
+            device = registry.async_get_device(identifiers={(DOMAIN, roomId)})
+            if device is None:
+                continue
+            _LOGGER.info("Tiko room %s removed, removing its device", roomId)
+            registry.async_update_device(
+                device.id, remove_config_entry_id=self._config_entry.entry_id
+            )
+
+    @staticmethod
+    def _apply_commands(room, commands):
+        """Apply commands to the data of a room."""
+        if "mode" in commands:
+            for mode in ROOM_MODES:
+                setattr(room.mode, mode, mode == commands["mode"])
+        if "temperature" in commands:
+            room.targetTemperatureDegrees = commands["temperature"]
+
+    @callback
+    def _async_apply_optimistic(self, propertyId, roomId):
+        """Show the queued commands of a room before they are sent."""
+        key = (propertyId, roomId)
+        room = self._rooms.get(key)
+        if room is None:
+            return
+        self._apply_commands(room, self._commands.get_commands(key))
+        self._client.forgetDigest()
+        self._changed_rooms = {key}
+        self.async_update_listeners()
+
+    @callback
+    def queue_room_mode(self, propertyId, roomId, mode):
+        """Queue a room mode change."""
+        self._commands.enqueue(propertyId, roomId, "mode", mode)
+        self._async_apply_optimistic(propertyId, roomId)
+        self._async_command_queued()
+
+    @callback
+    def queue_room_temperature(self, propertyId, roomId, temperature):
+        """Queue a room temperature change."""
+        self._commands.enqueue(propertyId, roomId, "temperature", temperature)
+        self._async_apply_optimistic(propertyId, roomId)
+        self._async_command_queued()
+
+    async def async_flush_commands(self):
+        """Send the queued commands now."""
+        await self._commands.async_flush()
+
+    async def async_shutdown(self):
+        """Cancel the queued commands and the scheduled refreshes, may run twice on unload."""
+        if self._unsub_registry is not None:
+            self._unsub_registry()
+            self._unsub_registry = None
+        self._commands.async_cancel()
+        await super().async_shutdown()
+
+    @staticmethod
+    def _patch_room(room, mode=None, temperature=None):
+        """Merge a mutation response into a room, return True if it changed."""
+        before = (replace(room.mode), room.targetTemperatureDegrees)
+        if mode is not None:
+            room.mode = mode
+        if temperature is not None:
+            room.targetTemperatureDegrees = temperature
+        return (room.mode, room.targetTemperatureDegrees) != before
+
+    async def set_rooms(self, commands):
+        """Send the commands of several rooms in one request.
+
+        `commands` maps (property id, room id) to {"mode": ..., "temperature": ...},
+        return the rooms whose responses can't be applied.
+        """
+        batch = []
+        for [propertyId, roomId], roomCommands in commands.items():
+            # The mode first, the temperature adjustment applies on top of it
+            if "mode" in roomCommands:
+                batch.append((propertyId, roomId, "mode", roomCommands["mode"]))
+            if "temperature" in roomCommands:
+                batch.append(
+                    (propertyId, roomId, "temperature", roomCommands["temperature"])
+                )
+        if not batch:
+            return set()
+
+        results = await self._auth.call(self._client.setRooms, batch)
+
+        # Apply every response, then notify the changed rooms at once
+        unpatched = set()
+        changed = set()
+        for [propertyId, roomId, command, _], result in zip(batch, results):
+            key = (propertyId, roomId)
+            room = self._rooms.get(key)
+            if room is None or result is None:
+                unpatched.add(key)
+                continue
+            if command == "mode":
+                [mode, temperature] = result
+            else:
+                [mode, temperature] = [None, result]
+            if self._patch_room(room, mode, temperature):
+                changed.add(key)
+
+        self._client.forgetDigest()
+        if changed:
+            self._changed_rooms = changed
+            self.async_update_listeners()
+        return unpatched
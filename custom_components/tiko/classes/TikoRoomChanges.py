@@ -0,0 +1,31 @@
+class TikoRoomChanges:
+    """Coordinator mixin tracking the rooms changed by the last refresh.
+
+    Entities of the unchanged rooms skip their state write.
+    """
+
+    def _init_room_changes(self):
+        """Start with every room changed."""
+        # Rooms whose data changed during the last refresh, None means all of them
+        self._changed_rooms = None
+        self.suppressed_writes = 0
+
+    def _diff_rooms(self, previous, current):
+        """Diff each room of the new data, by key, against the previous snapshot."""
+        if self.last_update_success and previous is not None:
+            self._changed_rooms = {
+                key for key, value in current.items() if previous.get(key) != value
+            }
+        else:
+            self._changed_rooms = None
+
+    def is_room_changed(self, propertyId, roomId):
+        """Return True if the entities of a room have to write their state."""
+        if (
+            not self.last_update_success
+            or self._changed_rooms is None
+            or (propertyId, roomId) in self._changed_rooms
+        ):
+            return True
+        self.suppressed_writes += 1
+        return False
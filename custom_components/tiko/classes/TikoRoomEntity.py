@@ -0,0 +1,56 @@
+from abc import abstractmethod
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from ..const import DOMAIN
+
+
+def roomDeviceInfo(room):
+    """Return the device information shared by the entities of a room."""
+    return {
+        "identifiers": {(DOMAIN, room.id)},
+        "name": room.name,
+        "manufacturer": "Tiko",
+        "model": "Tiko Equipment",
+        "sw_version": "1.0",
+    }
+
+
+class TikoRoomEntity(CoordinatorEntity):
+    """Base of the entities of a room.
+
+    Static attributes are set once at construction, the ones read from the
+    room are computed by _update_attrs once per coordinator update so a state
+    write only reads plain attributes.
+    """
+
+    def __init__(self, coordinator, property_id, room):
+        """Entity initialization."""
+        super().__init__(coordinator)
+        self._room_id = room.id
+        self._property_id = property_id
+        self._coordinator = coordinator
+        self._attr_device_info = roomDeviceInfo(room)
+
+    # -------------------------------------------
+    # Helpers
+    # -------------------------------------------
+
+    def _get_room_data(self):
+        return self._coordinator.get_room(self._property_id, self._room_id)
+
+    @abstractmethod
+    def _update_attrs(self):
+        """Compute the attributes read from the room."""
+
+    # -------------------------------------------
+    # Coordinator refresh
+    # -------------------------------------------
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if self._coordinator.is_room_changed(self._property_id, self._room_id):
+            self._update_attrs()
+            self.async_write_ha_state()
@@ -0,0 +1,210 @@
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    StatisticMeanType = None
+
+from ..api import TikoApiError, TikoAuthError
+from ..const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hourly history imported for the rooms without statistics yet
+BACKFILL_PERIOD = timedelta(days=30)
+
+# Hours fetched by a single request, and requests made by a run
+CHUNK_HOURS = 7 * 24
+MAX_CHUNKS_PER_RUN = 5
+
+# An hour is imported only once Tiko had time to publish its last values
+IMPORT_DELAY = timedelta(hours=1)
+
+# Delay (seconds) between two runs, shorter while the backfill is not complete
+IMPORT_INTERVAL = 3600
+BACKFILL_INTERVAL = 60
+
+HOUR = timedelta(hours=1)
+
+
+class TikoStatisticsImporter:
+    """Import the hourly room consumption as long-term statistics."""
+
+    def __init__(self, hass, coordinator, auth):
+        """Importer initialization."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._auth = auth
+        self._client = auth.client
+        self._timer = None
+        self._stopped = False
+
+        # Last imported hour and running sum (Wh) of each room
+        self._positions = None
+
+    # -------------------------------------------
+    # Helpers
+    # -------------------------------------------
+
+    @staticmethod
+    def statistic_id(propertyId, roomId):
+        """Return the external statistic id of a room."""
+        return f"{DOMAIN}:energy_{propertyId}_{roomId}"
+
+    @staticmethod
+    def _timestamp(value):
+        """Return a datetime as a timestamp (ms)."""
+        return int(value.timestamp() * 1000)
+
+    def _metadata(self, propertyId, room):
+        """Return the statistic metadata of a room."""
+        metadata = {
+            "has_sum": True,
+            "name": f"{room.name} Energy Consumption",
+            "source": DOMAIN,
+            "statistic_id": self.statistic_id(propertyId, room.id),
+            "unit_of_measurement": UnitOfEnergy.WATT_HOUR,
+        }
+
+        # has_mean was replaced by mean_type in newer Home Assistant versions
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.NONE
+        else:
+            metadata["has_mean"] = False
+        return metadata
+
+    async def _async_load_position(self, statisticId):
+        """Return the last imported hour and sum of a statistic."""
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics, self._hass, 1, statisticId, True, {"sum"}
+        )
+        if not last.get(statisticId):
+            return None
+
+        stat = last[statisticId][0]
+        start = stat["start"]
+        if not isinstance(start, datetime):
+            start = dt_util.utc_from_timestamp(start)
+        return (start, stat["sum"] or 0)
+
+    # -------------------------------------------
+    # Scheduling
+    # -------------------------------------------
+
+    @callback
+    def async_start(self):
+        """Schedule the first import once the startup settled."""
+        self._stopped = False
+        self._schedule(BACKFILL_INTERVAL)
+
+    @callback
+    def async_stop(self):
+        """Cancel the next import."""
+        self._stopped = True
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+
+    @callback
+    def _schedule(self, delay):
+        if self._stopped:
+            return
+        self._timer = async_call_later(self._hass, delay, self._async_run)
+
+    async def _async_run(self, _now):
+        """Import the hours available, then schedule the next run."""
+        self._timer = None
+        complete = False
+        try:
+            complete = await self.async_import()
+        except (TikoApiError, TikoAuthError) as err:
+            _LOGGER.warning("Unable to import the Tiko statistics: %s", err)
+        except Exception:
+            _LOGGER.exception("Unexpected error importing the Tiko statistics")
+
+        self._schedule(IMPORT_INTERVAL if complete else BACKFILL_INTERVAL)
+
+    # -------------------------------------------
+    # Import
+    # -------------------------------------------
+
+    async def async_import(self):
+        """Import the completed hours, return True once up to date."""
+        if not self._coordinator.data:
+            return False
+
+        rooms = {
+            (prop.id, room.id): (prop.id, room)
+            for prop in self._coordinator.data
+            for room in prop.rooms
+        }
+
+        # Resume each room after its last imported hour
+        end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        end -= IMPORT_DELAY
+        if self._positions is None:
+            self._positions = {}
+        for key in rooms.keys() - self._positions.keys():
+            position = await self._async_load_position(self.statistic_id(*key))
+            self._positions[key] = position or (end - BACKFILL_PERIOD - HOUR, 0)
+
+        start = min(
+            (position[0] for key, position in self._positions.items() if key in rooms),
+            default=end,
+        )
+        start += HOUR
+
+        # One hourly resolution request per chunk of hours
+        for _ in range(MAX_CHUNKS_PER_RUN):
+            if start >= end:
+                return True
+
+            hours = [
+                start + HOUR * i
+                for i in range(CHUNK_HOURS)
+                if start + HOUR * i < end
+            ]
+            roomsConsumption = await self._auth.call(
+                self._client.getConsumptionSeries,
+                self._timestamp(hours[0]),
+                self._timestamp(hours[-1] + HOUR),
+            )
+
+            # Values of each room for each hour of the chunk
+            values = {
+                (roomConsumption.propertyId, roomConsumption.id): dict(
+                    zip(hours, roomConsumption.valuesWh)
+                )
+                for roomConsumption in roomsConsumption
+            }
+
+            for key, (propertyId, room) in rooms.items():
+                [lastHour, total] = self._positions[key]
+                statistics = []
+                for hour in hours:
+                    if hour <= lastHour:
+                        continue
+                    value = values.get(key, {}).get(hour, 0)
+                    total += value
+                    statistics.append({"start": hour, "state": value, "sum": total})
+
+                if statistics:
+                    async_add_external_statistics(
+                        self._hass, self._metadata(propertyId, room), statistics
+                    )
+                    self._positions[key] = (statistics[-1]["start"], total)
+
+            start = hours[-1] + HOUR
+
+        return start >= end
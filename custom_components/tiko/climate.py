@@ -1,7 +1,24 @@
 import logging
+import voluptuous as vol
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.core import callback
+from homeassistant.helpers import entity_platform
 from .classes.TikoClimate import TikoClimate
 from .const import DOMAIN
 
+ATTR_MODE = "mode"
+SERVICE_SET_ROOMS = "set_rooms"
+
+# Service values of the Tiko room modes
+ROOM_MODES = {
+    "none": None,
+    "comfort": "comfort",
+    "absence": "absence",
+    "sleep": "sleep",
+    "frost": "frost",
+    "disable_heating": "disableHeating",
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -10,25 +27,23 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     # Get Tiko data
     coordinator = hass.data[DOMAIN][config_entry.entry_id][0]
-    tiko_data = coordinator.data
-
-    # Check if we have valid data
-    if (
-        not tiko_data
-        or "data" not in tiko_data
-        or "properties" not in tiko_data["data"]
-    ):
-        _LOGGER.warning(
-            "No Tiko data available during climate setup, waiting for first update"
-        )
-        return
-
-    # For each property
-    entities = []
-    for prop in tiko_data["data"]["properties"]:
-        property_id = prop["id"]
-
-        for room in prop["rooms"]:
+
+    # Rooms having their climate
+    known = set()
+
+    @callback
+    def async_add_rooms():
+        """Create the climates of the rooms discovered since the last update."""
+        rooms = coordinator.get_rooms()
+        known.intersection_update(rooms.keys())
+
+        entities = []
+        for key, room in rooms.items():
+            if key in known:
+                continue
+            known.add(key)
+            [property_id, _] = key
+
             # Climate
             entities.append(
                 TikoClimate(
@@ -38,6 +53,25 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 )
             )
 
-    # Push sensors to HA
-    if entities:
-        async_add_entities(entities, update_before_add=True)
+        # Push climates to HA
+        if entities:
+            async_add_entities(entities)
+
+    # Add the rooms known now, then the ones found by the next updates
+    async_add_rooms()
+    config_entry.async_on_unload(coordinator.async_add_listener(async_add_rooms))
+
+    # Bulk change of rooms, the changes are sent in a single request
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_ROOMS,
+        {
+            vol.Optional(ATTR_MODE): vol.All(
+                vol.In(list(ROOM_MODES)), ROOM_MODES.get
+            ),
+            vol.Optional(ATTR_TEMPERATURE): vol.All(
+                vol.Coerce(float), vol.Range(min=1, max=40)
+            ),
+        },
+        "async_set_room",
+    )
@@ -4,11 +4,11 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import callback
 
-from .api import login
-from .const import CONF_API_URL, DOMAIN
+from .api import TikoApiClient, TikoApiError
+from .const import CONF_API_URL, CONF_TOKENS, DEFAULT_API_URL, DOMAIN
 
 API_OPTIONS = {
-    "https://particuliers-tiko.fr/api/v3/graphql/": "Tiko.fr",
+    DEFAULT_API_URL: "Tiko.fr",
     "https://portal-engie.tiko.ch/api/v3/graphql/": "Tiko.ch",
 }
 
@@ -32,9 +32,16 @@ class TikoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self.password = user_input[CONF_PASSWORD]
 
             # Try to login
-            tokens = await login(self.api, self.username, self.password)
+            client = TikoApiClient(self.api)
+            tokens = None
+            try:
+                tokens = await client.login(self.username, self.password)
+            except TikoApiError:
+                errors["base"] = "cannot_connect"
+            finally:
+                await client.close()
             if not tokens:
-                errors["base"] = "auth"
+                errors.setdefault("base", "auth")
             else:
                 return self.async_create_entry(
                     title=DOMAIN,
@@ -42,6 +49,7 @@ class TikoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_USERNAME: self.username,
                         CONF_PASSWORD: self.password,
                         CONF_API_URL: self.api,
+                        CONF_TOKENS: tokens,
                     },
                 )
 
@@ -51,7 +59,7 @@ class TikoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 {
                     vol.Optional(
                         CONF_API_URL,
-                        default="https://particuliers-tiko.fr/api/v3/graphql/",
+                        default=DEFAULT_API_URL,
                     ): vol.In(API_OPTIONS),
                     vol.Required(CONF_USERNAME, default=self.username): str,
                     vol.Required(CONF_PASSWORD, default=self.password): str,
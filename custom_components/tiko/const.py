@@ -1,2 +1,32 @@
+from datetime import timedelta
+
 DOMAIN = "tiko"
 CONF_API_URL = "api"
+CONF_TOKENS = "tokens"
+DEFAULT_API_URL = "https://particuliers-tiko.fr/api/v3/graphql/"
+
+# hass.data key of the rate limiters shared by the entries of an account
+DATA_RATE_LIMITERS = f"{DOMAIN}_rate_limiters"
+
+STORAGE_VERSION = 1
+CONSUMPTION_STORAGE_KEY = "tiko.consumption.{}"
+SNAPSHOT_STORAGE_KEY = "tiko.snapshot.{}"
+
+# Delay (seconds) used to group the writes of the last known data
+SNAPSHOT_SAVE_DELAY = 60
+
+# Polling intervals of the data coordinator
+UPDATE_INTERVAL = timedelta(seconds=30)
+FAST_UPDATE_INTERVAL = timedelta(seconds=10)
+HEATING_UPDATE_INTERVAL = timedelta(seconds=20)
+SLOW_UPDATE_INTERVAL = timedelta(seconds=120)
+MAX_BACKOFF_INTERVAL = timedelta(minutes=10)
+
+# Upper bound (seconds) of a refresh, the API calls and their retries included
+FETCH_TIMEOUT = 60
+
+# Poll fast during this delay (seconds) after a user command
+COMMAND_UPDATE_WINDOW = 120
+
+# Number of refreshes without any change before slowing down
+STABLE_REFRESHES = 3
@@ -0,0 +1,42 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from .const import CONF_TOKENS, DOMAIN
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, CONF_TOKENS}
+
+
+async def async_get_config_entry_diagnostics(hass, config_entry):
+    """Return the diagnostics of a config entry."""
+    [coordinator, consumptionCoordinator, client] = hass.data[DOMAIN][
+        config_entry.entry_id
+    ]
+
+    return {
+        "entry": async_redact_data(dict(config_entry.data), TO_REDACT),
+        "api": {name: stats.asDict() for name, stats in client.stats.items()},
+        "circuit_breaker": {
+            "state": client.circuitBreaker.state,
+            "failures": client.circuitBreaker.failures,
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "last_seen": (
+                coordinator.last_seen.isoformat() if coordinator.last_seen else None
+            ),
+            "failures": coordinator.failures,
+            "rooms": coordinator.room_count,
+            "suppressed_writes": coordinator.suppressed_writes,
+            "joined_refreshes": coordinator.joined_refreshes,
+        },
+        "consumption_coordinator": {
+            "last_update_success": consumptionCoordinator.last_update_success,
+            "polling": consumptionCoordinator.is_polling,
+            "rooms": len(consumptionCoordinator.data or {}),
+            "suppressed_writes": consumptionCoordinator.suppressed_writes,
+        },
+    }
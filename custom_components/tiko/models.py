@@ -0,0 +1,137 @@
+from dataclasses import asdict, dataclass, field
+
+# Field names follow the GraphQL schema so records convert back to API payloads
+
+
+@dataclass(slots=True)
+class RoomMode:
+    """Mode flags of a room."""
+
+    comfort: bool = False
+    absence: bool = False
+    frost: bool = False
+    sleep: bool = False
+    disableHeating: bool = False
+
+    @classmethod
+    def fromDict(cls, data):
+        """Parse a RoomModeType block."""
+        return cls(
+            comfort=bool(data.get("comfort")),
+            absence=bool(data.get("absence")),
+            frost=bool(data.get("frost")),
+            sleep=bool(data.get("sleep")),
+            disableHeating=bool(data.get("disableHeating")),
+        )
+
+
+@dataclass(slots=True)
+class RoomStatus:
+    """Status flags of a room."""
+
+    heatingOperating: bool = False
+    sensorBatteryLow: bool = False
+
+    @classmethod
+    def fromDict(cls, data):
+        """Parse a RoomStatusType block."""
+        return cls(
+            heatingOperating=bool(data.get("heatingOperating")),
+            sensorBatteryLow=bool(data.get("sensorBatteryLow")),
+        )
+
+
+@dataclass(slots=True)
+class Room:
+    """A room of a property."""
+
+    id: int
+    name: str
+    currentTemperatureDegrees: float | None
+    targetTemperatureDegrees: float | None
+    humidity: float | None
+    sensors: int
+    mode: RoomMode
+    status: RoomStatus
+
+    @classmethod
+    def fromDict(cls, data):
+        """Parse a RoomType block."""
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            currentTemperatureDegrees=data.get("currentTemperatureDegrees"),
+            targetTemperatureDegrees=data.get("targetTemperatureDegrees"),
+            humidity=data.get("humidity"),
+            sensors=data.get("sensors") or 0,
+            mode=RoomMode.fromDict(data.get("mode") or {}),
+            status=RoomStatus.fromDict(data.get("status") or {}),
+        )
+
+
+@dataclass(slots=True)
+class Property:
+    """A property (home) and its rooms."""
+
+    id: int
+    name: str
+    mode: dict | None
+    rooms: list[Room]
+
+    @classmethod
+    def fromDict(cls, data):
+        """Parse a PropertyType block."""
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            mode=data.get("mode"),
+            rooms=[Room.fromDict(room) for room in data["rooms"]],
+        )
+
+
+@dataclass(slots=True)
+class RoomConsumption:
+    """Energy consumed by a room over a period."""
+
+    propertyId: int
+    id: int
+    name: str
+    energyWh: float
+
+    # Consumption (Wh) of each resolution step of the period, when requested
+    valuesWh: list = field(default_factory=list)
+
+    @classmethod
+    def fromDict(cls, propertyId, data):
+        """Parse a roomsConsumption item."""
+        return cls(
+            propertyId=propertyId,
+            id=data["id"],
+            name=data.get("name"),
+            energyWh=data.get("energyWh") or 0,
+            valuesWh=[value or 0 for value in data.get("valuesWh") or ()],
+        )
+
+
+def parseProperties(data):
+    """Parse a HA_GET_DATA response."""
+    return [Property.fromDict(prop) for prop in data["data"]["properties"]]
+
+
+def parseConsumption(data):
+    """Parse a HA_GET_CONSUMPTION_DATA or HA_GET_CONSUMPTION_SERIES response."""
+    return [
+        RoomConsumption.fromDict(prop["id"], room)
+        for prop in data["data"]["properties"]
+        for room in prop["fastConsumption"]["roomsConsumption"]
+    ]
+
+
+def parseRoomModeResult(data):
+    """Parse an activateRoomMode block, return the room mode and its target temperature."""
+    return (RoomMode.fromDict(data["mode"]), data.get("targetTemperatureDegrees"))
+
+
+def propertiesToDict(properties):
+    """Convert properties back to a HA_GET_DATA response."""
+    return {"data": {"properties": [asdict(prop) for prop in properties]}}
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 MUTATION_LOGIN = """
 mutation HA_LOGIN($email: String!, $password: String!, $langCode: String, $retainSession: Boolean) {
   logIn(
@@ -13,39 +15,134 @@ mutation HA_LOGIN($email: String!, $password: String!, $langCode: String, $retai
 }
 """
 
-QUERY_GET_DATA = """
-query HA_GET_DATA {
-  properties {
+# Room fields, in query order, "block.field" are fields of a nested block
+ROOM_FIELDS = (
+    "id",
+    "name",
+    "currentTemperatureDegrees",
+    "targetTemperatureDegrees",
+    "humidity",
+    "sensors",
+    "mode.comfort",
+    "mode.absence",
+    "mode.frost",
+    "mode.sleep",
+    "mode.disableHeating",
+    "status.heatingOperating",
+    "status.sensorBatteryLow",
+)
+
+# Room fields always fetched, the coordinator uses them to schedule the polls and
+# the platforms to decide which entities a room has
+BASE_ROOM_FIELDS = (
+    "id",
+    "name",
+    "humidity",
+    "sensors",
+    "mode.disableHeating",
+    "status.heatingOperating",
+)
+
+# Room fields read by each entity type
+ENTITY_ROOM_FIELDS = {
+    "climate": (
+        "currentTemperatureDegrees",
+        "targetTemperatureDegrees",
+        "mode.comfort",
+        "mode.absence",
+        "mode.frost",
+        "mode.sleep",
+    ),
+    "temperature_current": ("currentTemperatureDegrees",),
+    "temperature_target": ("targetTemperatureDegrees",),
+    "humidity": (),
+    "battery": ("status.sensorBatteryLow",),
+}
+
+CONSUMPTION_FIELD = """
+    fastConsumption(
+      start: $timestampStart
+      end: $timestampEnd
+      resolution: $resolution
+    ) {
+      roomsConsumption {
+        id
+        name
+        energyKwh
+        energyWh
+        __typename
+      }
+      __typename
+    }"""
+
+
+def roomFields(entityTypes):
+    """Return the room fields needed by a set of entity types."""
+    fields = set(BASE_ROOM_FIELDS)
+    for entityType in entityTypes:
+        fields.update(ENTITY_ROOM_FIELDS.get(entityType, ()))
+    return frozenset(fields)
+
+
+@lru_cache(maxsize=16)
+def buildDataQuery(fields=frozenset(ROOM_FIELDS), consumption=False):
+    """Build the HA_GET_DATA query of a set of room fields.
+
+    With consumption, the HA_GET_DATA_AND_CONSUMPTION query also fetching the
+    room consumption between $timestampStart and $timestampEnd.
+    """
+    lines = []
+    blocks = {}
+    for field in ROOM_FIELDS:
+        if field not in fields:
+            continue
+        if "." not in field:
+            lines.append(f"      {field}")
+            continue
+        [block, name] = field.split(".")
+        if block not in blocks:
+            blocks[block] = []
+            lines.append(block)
+        blocks[block].append(f"        {name}")
+
+    # Expand the nested blocks at their position
+    room = []
+    for line in lines:
+        if line in blocks:
+            room.append(f"      {line} {{")
+            room.extend(blocks[line])
+            room.append("        __typename")
+            room.append("      }")
+        else:
+            room.append(line)
+    room = "\n".join(room)
+
+    if consumption:
+        header = (
+            "query HA_GET_DATA_AND_CONSUMPTION($timestampStart: BigInt!, "
+            "$timestampEnd: BigInt!, $resolution: String!)"
+        )
+    else:
+        header = "query HA_GET_DATA"
+    return f"""
+{header} {{
+  properties {{
     id
     name
     mode
-    rooms {
-      id
-      name
-      currentTemperatureDegrees
-      targetTemperatureDegrees
-      humidity
-      sensors
-      mode {
-        comfort
-        absence
-        frost
-        sleep
-        disableHeating
-        __typename
-      }
-      status {
-        heatingOperating
-        sensorBatteryLow
-        __typename
-      }
+    rooms {{
+{room}
       __typename
-    }
+    }}{CONSUMPTION_FIELD if consumption else ""}
     __typename
-  }
-}
+  }}
+}}
 """
 
+
+QUERY_GET_DATA = buildDataQuery()
+QUERY_GET_DATA_AND_CONSUMPTION = buildDataQuery(consumption=True)
+
 QUERY_GET_CONSUMPTION_DATA = """
 query HA_GET_CONSUMPTION_DATA($timestampStart: BigInt!, $timestampEnd: BigInt!, $resolution: String!) {
   properties {
@@ -73,6 +170,7 @@ MUTATION_SET_ROOM_MODE = """
 mutation HA_SET_ROOM_MODE($propertyId: Int!, $roomId: Int!, $mode: String) {
   activateRoomMode(input: {propertyId: $propertyId, roomId: $roomId, mode: $mode}) {
     id
+    targetTemperatureDegrees
     mode {
       comfort
       absence
@@ -103,3 +201,81 @@ mutation HA_SET_ROOM_TEMPERATURE($propertyId: Int!, $roomId: Int!, $temperature:
   }
 }
 """
+
+
+QUERY_GET_CONSUMPTION_SERIES = """
+query HA_GET_CONSUMPTION_SERIES($timestampStart: BigInt!, $timestampEnd: BigInt!, $resolution: String!) {
+  properties {
+    id
+    fastConsumption(
+      start: $timestampStart
+      end: $timestampEnd
+      resolution: $resolution
+    ) {
+      roomsConsumption {
+        id
+        energyWh
+        valuesWh
+        __typename
+      }
+      __typename
+    }
+    __typename
+  }
+}
+"""
+
+
+@lru_cache(maxsize=32)
+def buildRoomsMutation(commands):
+    """Build a mutation sending several room commands at once.
+
+    `commands` is a tuple of "mode" or "temperature", command i is the field
+    aliased ci using the variables $propertyId<i>, $roomId<i> and $mode<i> or
+    $temperature<i>. Mutation fields are executed in order.
+    """
+    variables = []
+    fields = []
+    for i, command in enumerate(commands):
+        variables.append(f"$propertyId{i}: Int!, $roomId{i}: Int!")
+        if command == "mode":
+            variables.append(f"$mode{i}: String")
+            fields.append(
+                f"""
+  c{i}: activateRoomMode(
+    input: {{propertyId: $propertyId{i}, roomId: $roomId{i}, mode: $mode{i}}}
+  ) {{
+    id
+    targetTemperatureDegrees
+    mode {{
+      comfort
+      absence
+      frost
+      sleep
+      disableHeating
+      __typename
+    }}
+    __typename
+  }}"""
+            )
+        else:
+            variables.append(f"$temperature{i}: Float!")
+            fields.append(
+                f"""
+  c{i}: setRoomAdjustTemperature(
+    input: {{propertyId: $propertyId{i}, roomId: $roomId{i}, temperature: $temperature{i}}}
+  ) {{
+    id
+    adjustTemperature {{
+      active
+      endDateTime
+      temperature
+      __typename
+    }}
+    __typename
+  }}"""
+            )
+    return f"""
+mutation HA_SET_ROOMS({", ".join(variables)}) {{{"".join(fields)}
+}}
+"""
@@ -1,8 +1,11 @@
 import logging
+from homeassistant.core import callback
 from .classes.TikoHumiditySensor import TikoHumiditySensor
 from .classes.TikoTemperatureSensor import TikoTemperatureSensor
 from .classes.TikoBatterySensor import TikoBatterySensor
 from .classes.TikoConsumptionSensor import TikoConsumptionSensor
+from .classes.TikoApiSensor import TikoApiSensor
+from .api import OPERATION_NAMES
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -14,26 +17,35 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     # Get Tiko data
     coordinator = hass.data[DOMAIN][config_entry.entry_id][0]
     consumptionCoordinator = hass.data[DOMAIN][config_entry.entry_id][1]
-    tiko_data = coordinator.data
+    client = hass.data[DOMAIN][config_entry.entry_id][2]
 
-    # Check if we have valid data
-    if (
-        not tiko_data
-        or "data" not in tiko_data
-        or "properties" not in tiko_data["data"]
-    ):
-        _LOGGER.warning(
-            "No Tiko data available during sensor setup, waiting for first update"
-        )
-        return
+    # API diagnostic sensors
+    entities = [
+        TikoApiSensor(config_entry, client, "latency", operation)
+        for operation in OPERATION_NAMES
+        if operation != "other"
+    ]
+    for type in ("calls", "errors", "timeouts", "last_success"):
+        entities.append(TikoApiSensor(config_entry, client, type))
+    async_add_entities(entities)
 
-    # For each property
-    entities = []
-    for prop in tiko_data["data"]["properties"]:
-        property_id = prop["id"]
+    # Rooms having their sensors
+    known = set()
 
-        for room in prop["rooms"]:
-            if room["humidity"] is not None:
+    @callback
+    def async_add_rooms():
+        """Create the sensors of the rooms discovered since the last update."""
+        rooms = coordinator.get_rooms()
+        known.intersection_update(rooms.keys())
+
+        entities = []
+        for key, room in rooms.items():
+            if key in known:
+                continue
+            known.add(key)
+            [property_id, _] = key
+
+            if room.humidity is not None:
                 # Humidity sensor
                 entities.append(
                     TikoHumiditySensor(
@@ -73,7 +85,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             )
 
             # Battery sensor
-            if room["sensors"] > 0:
+            if room.sensors > 0:
                 entities.append(
                     TikoBatterySensor(
                         coordinator=coordinator,
@@ -82,6 +94,10 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                     )
                 )
 
-    # Push sensors to HA
-    if entities:
-        async_add_entities(entities, update_before_add=True)
+        # Push sensors to HA
+        if entities:
+            async_add_entities(entities)
+
+    # Add the rooms known now, then the ones found by the next updates
+    async_add_rooms()
+    config_entry.async_on_unload(coordinator.async_add_listener(async_add_rooms))
@@ -0,0 +1,21 @@
+"""Helpers shared by the tests."""
+
+from contextlib import asynccontextmanager
+import tempfile
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+
+@asynccontextmanager
+async def homeAssistant():
+    """Run a bare Home Assistant instance in a temporary configuration folder."""
+    with tempfile.TemporaryDirectory() as configDir:
+        hass = HomeAssistant(configDir)
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
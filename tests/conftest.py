@@ -0,0 +1,5 @@
+"""Test configuration of the Tiko integration."""
+
+# homeassistant.core has to be imported before the integration, importing
+# homeassistant.helpers.storage first ends in a circular import
+import homeassistant.core  # noqa: F401
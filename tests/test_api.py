@@ -0,0 +1,262 @@
+import asyncio
+
+import pytest
+
+from custom_components.tiko import api
+from custom_components.tiko.api import (
+    MAX_RETRIES,
+    RETRY_MAX_DELAY,
+    TikoApiClient,
+    TikoApiError,
+    TikoApiResult,
+    TikoCircuitOpenError,
+)
+from custom_components.tiko.queries import MUTATION_SET_ROOM_MODE, QUERY_GET_DATA
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Record the retry delays instead of sleeping."""
+    recorded = []
+
+    async def sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(api.asyncio, "sleep", sleep)
+    return recorded
+
+
+def failingPost(failures, retryable=True):
+    """Return a _post stub failing a number of times before answering."""
+    calls = []
+
+    async def post(operation, body, dedupe, stats):
+        calls.append(operation)
+        if len(calls) <= failures:
+            raise TikoApiError("Bad gateway", status=502, retryable=retryable)
+        return "ok"
+
+    post.calls = calls
+    return post
+
+
+def test_idempotent_query_is_retried_with_jitter(delays):
+    """A transient error of a query is retried after a bounded random delay."""
+
+    async def run():
+        client = TikoApiClient()
+        client._post = failingPost(MAX_RETRIES)
+
+        assert await client.gqlCall(QUERY_GET_DATA) == "ok"
+        assert len(client._post.calls) == MAX_RETRIES + 1
+        assert len(delays) == MAX_RETRIES
+        assert all(0 <= delay <= RETRY_MAX_DELAY for delay in delays)
+        assert client.circuitBreaker.failures == 0
+
+    asyncio.run(run())
+
+
+def test_retries_are_bounded(delays):
+    """A query failing more than MAX_RETRIES times raises and counts one failure."""
+
+    async def run():
+        client = TikoApiClient()
+        client._post = failingPost(MAX_RETRIES + 1)
+
+        with pytest.raises(TikoApiError):
+            await client.gqlCall(QUERY_GET_DATA)
+        assert len(client._post.calls) == MAX_RETRIES + 1
+        assert client.circuitBreaker.failures == 1
+
+    asyncio.run(run())
+
+
+def test_mutations_and_permanent_errors_are_not_retried(delays):
+    """Mutations are sent once, and so are queries failing permanently."""
+
+    async def run():
+        client = TikoApiClient()
+        client._post = failingPost(1)
+        with pytest.raises(TikoApiError):
+            await client.gqlCall(
+                MUTATION_SET_ROOM_MODE, {"propertyId": 1, "roomId": 2, "mode": None}
+            )
+        assert len(client._post.calls) == 1
+
+        client._post = failingPost(1, retryable=False)
+        with pytest.raises(TikoApiError):
+            await client.gqlCall(QUERY_GET_DATA)
+        assert len(client._post.calls) == 1
+        assert delays == []
+
+    asyncio.run(run())
+
+
+def test_circuit_opens_after_repeated_failures(delays):
+    """Once open, the circuit fails the calls without sending them."""
+
+    async def run():
+        client = TikoApiClient()
+        breaker = client.circuitBreaker
+        client._post = failingPost(1000, retryable=False)
+
+        for _ in range(breaker.failureThreshold):
+            with pytest.raises(TikoApiError):
+                await client.gqlCall(QUERY_GET_DATA)
+        assert breaker.state == "open"
+
+        with pytest.raises(TikoCircuitOpenError):
+            await client.gqlCall(QUERY_GET_DATA)
+        assert len(client._post.calls) == breaker.failureThreshold
+
+    asyncio.run(run())
+
+
+def test_successful_probe_closes_the_circuit():
+    """The call probing the API after the reset timeout closes the circuit."""
+
+    async def run():
+        client = TikoApiClient()
+        breaker = client.circuitBreaker
+        client._post = failingPost(0)
+
+        for _ in range(breaker.failureThreshold):
+            breaker.recordFailure()
+        breaker.openedAt -= breaker.resetTimeout
+
+        assert await client.gqlCall(QUERY_GET_DATA) == "ok"
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_probe_does_not_keep_the_circuit_open():
+    """A probe cancelled in flight lets the next call probe the API."""
+
+    async def run():
+        client = TikoApiClient()
+        breaker = client.circuitBreaker
+        posted = []
+        blocked = asyncio.Event()
+
+        async def post(operation, body, dedupe, stats):
+            posted.append(operation)
+            if len(posted) == 1:
+                blocked.set()
+                await asyncio.Event().wait()
+            return "ok"
+
+        client._post = post
+
+        # Open the circuit, then let the reset timeout elapse
+        for _ in range(breaker.failureThreshold):
+            breaker.recordFailure()
+        try:
+            await client.gqlCall(QUERY_GET_DATA)
+        except TikoCircuitOpenError:
+            pass
+        else:
+            raise AssertionError("The open circuit let a call through")
+        breaker.openedAt -= breaker.resetTimeout
+        assert breaker.state == "half_open"
+
+        # Cancel the probe while its request is in flight
+        probe = asyncio.ensure_future(client.gqlCall(QUERY_GET_DATA))
+        await blocked.wait()
+        probe.cancel()
+        try:
+            await probe
+        except asyncio.CancelledError:
+            pass
+
+        # The next call probes the API again and closes the circuit
+        assert await client.gqlCall(QUERY_GET_DATA) == "ok"
+        assert breaker.state == "closed"
+        assert len(posted) == 2
+
+    asyncio.run(run())
+
+
+def test_failed_probe_reopens_the_circuit():
+    """A probe failing keeps the circuit open for another reset timeout."""
+
+    async def run():
+        client = TikoApiClient()
+        breaker = client.circuitBreaker
+
+        async def post(operation, body, dedupe, stats):
+            raise TikoApiError("Unavailable", status=503, retryable=False)
+
+        client._post = post
+
+        for _ in range(breaker.failureThreshold):
+            breaker.recordFailure()
+        breaker.openedAt -= breaker.resetTimeout
+
+        try:
+            await client.gqlCall(QUERY_GET_DATA)
+        except TikoCircuitOpenError:
+            raise AssertionError("The probe was not sent")
+        except TikoApiError:
+            pass
+        assert breaker.state == "open"
+
+    asyncio.run(run())
+
+
+def test_consumption_error_keeps_the_room_data():
+    """A null consumption of the combined query only drops the consumption."""
+
+    async def run():
+        client = TikoApiClient()
+        room = {"id": 2, "name": "Room", "mode": {}, "status": {}}
+        data = {
+            "data": {
+                "properties": [
+                    {"id": 1, "name": "Home", "rooms": [room], "fastConsumption": None}
+                ]
+            }
+        }
+
+        async def gqlCall(query, variables=None, dedupe=False, operation=None):
+            return TikoApiResult(None, data)
+
+        client.gqlCall = gqlCall
+
+        [properties, consumption] = await client.getDataWithConsumption(0, 1)
+        assert properties[0].rooms[0].name == "Room"
+        assert consumption is None
+
+    asyncio.run(run())
+
+
+def test_invalid_json_is_recorded_as_an_error():
+    """An invalid JSON body counts as a failed call with its latency."""
+
+    class Response:
+        status = 200
+        cookies = {}
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+        async def read(self):
+            return b"<html>"
+
+    async def run():
+        client = TikoApiClient()
+        session = type("Session", (), {"post": lambda *args, **kwargs: Response()})
+        client._getSession = session
+        stats = client.stats["get_data"]
+
+        with pytest.raises(TikoApiError):
+            await client._post("get_data", "{}", False, stats)
+        assert stats.errors == 1
+        assert stats.calls == 1
+        assert stats.lastSuccess is None
+
+    asyncio.run(run())
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.tiko.classes.TikoConsumptionDataUpdateCoordinator import (
+    BACKFILL_START,
+    FOLD_DELAY,
+    TikoConsumptionDataUpdateCoordinator,
+)
+from custom_components.tiko.models import RoomConsumption
+
+from .common import homeAssistant
+
+
+class FakeApi:
+    """Consumption API returning 10 Wh per room and request."""
+
+    def __init__(self):
+        self.client = self
+        self.periods = []
+
+    async def call(self, func, *args):
+        return await func(*args)
+
+    async def getConsumptionData(self, timestampStart, timestampEnd):
+        self.periods.append((timestampStart, timestampEnd))
+        return [RoomConsumption(1, 2, "Room", 10.0)]
+
+
+class FakeDataCoordinator:
+    """Data coordinator answering the current day consumption."""
+
+    is_refreshing = False
+    last_update_success = True
+    last_exception = None
+
+    def __init__(self):
+        self.periods = []
+
+    async def async_refresh_with_consumption(self, timestampStart, timestampEnd):
+        self.periods.append((timestampStart, timestampEnd))
+        return [RoomConsumption(1, 2, "Room", 5.0)]
+
+
+def dayStart():
+    """Return the start (ms) of the last complete day."""
+    return int(
+        dt_util.start_of_local_day(dt_util.now() - FOLD_DELAY).timestamp() * 1000
+    )
+
+
+def test_completed_days_are_folded_once():
+    """The completed days are fetched once, then only the current day is."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            entry = SimpleNamespace(entry_id="test")
+            api = FakeApi()
+            dataCoordinator = FakeDataCoordinator()
+            coordinator = TikoConsumptionDataUpdateCoordinator(
+                hass, entry, api, dataCoordinator
+            )
+
+            await coordinator.async_refresh()
+            assert api.periods == [(BACKFILL_START, dayStart())]
+            assert dataCoordinator.periods[0][0] == dayStart()
+            assert coordinator.data == {(1, 2): 15.0}
+
+            await coordinator.async_refresh()
+            assert len(api.periods) == 1
+            assert len(dataCoordinator.periods) == 2
+            assert coordinator.data == {(1, 2): 15.0}
+
+    asyncio.run(run())
+
+
+def test_watermark_is_persisted():
+    """A new coordinator resumes from the stored watermark and totals, without a backfill."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            entry = SimpleNamespace(entry_id="test")
+            first = TikoConsumptionDataUpdateCoordinator(
+                hass, entry, FakeApi(), FakeDataCoordinator()
+            )
+            await first.async_refresh()
+
+            api = FakeApi()
+            second = TikoConsumptionDataUpdateCoordinator(
+                hass, entry, api, FakeDataCoordinator()
+            )
+            await second.async_refresh()
+            assert api.periods == []
+            assert second.data == {(1, 2): 15.0}
+
+    asyncio.run(run())
+
+
+def test_first_refresh_fetches_the_consumption_alone():
+    """The consumption refresh running with the data refresh doesn't fetch the rooms."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            entry = SimpleNamespace(entry_id="test")
+            api = FakeApi()
+            dataCoordinator = FakeDataCoordinator()
+            dataCoordinator.is_refreshing = True
+            coordinator = TikoConsumptionDataUpdateCoordinator(
+                hass, entry, api, dataCoordinator
+            )
+
+            await coordinator.async_refresh()
+            assert dataCoordinator.periods == []
+            assert len(api.periods) == 2
+            assert coordinator.data == {(1, 2): 20.0}
+
+    asyncio.run(run())
@@ -0,0 +1,189 @@
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.tiko.api import TikoApiError
+from custom_components.tiko.classes import TikoCommandQueue as queueModule
+from custom_components.tiko.classes.TikoDataUpdateCoordinator import (
+    TikoDataUpdateCoordinator,
+)
+from custom_components.tiko.const import MAX_BACKOFF_INTERVAL
+from custom_components.tiko.models import parseProperties
+
+from .common import homeAssistant
+
+
+class FakeApi:
+    """API client and auth manager failing every call."""
+
+    def __init__(self):
+        self.client = self
+
+    async def call(self, func, *args):
+        return await func(*args)
+
+    def forgetDigest(self, operation="get_data"):
+        pass
+
+    async def getData(self, query=None):
+        raise TikoApiError("Bad gateway", status=502, retryable=True)
+
+
+def test_backoff_is_bounded_during_long_outages():
+    """The polling interval stays bounded after many failures in a row."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            coordinator = TikoDataUpdateCoordinator(
+                hass, SimpleNamespace(entry_id="test"), FakeApi()
+            )
+            for _ in range(45):
+                await coordinator.async_refresh()
+
+            assert coordinator._failures == 45
+            assert isinstance(coordinator.last_exception, UpdateFailed)
+            assert coordinator.update_interval <= MAX_BACKOFF_INTERVAL * 1.25
+            await coordinator.async_shutdown()
+
+    asyncio.run(run())
+
+
+class FakeTikoApi:
+    """API client and auth manager of a single room, with a pausable poll."""
+
+    def __init__(self):
+        self.client = self
+        self.target = 19.0
+        self.paused = None
+
+    async def call(self, func, *args):
+        return await func(*args)
+
+    def forgetDigest(self, operation="get_data"):
+        pass
+
+    async def getData(self, query=None):
+        # The data is read when the request is sent
+        target = self.target
+        if self.paused is not None:
+            await self.paused.wait()
+        return parseProperties(
+            {
+                "data": {
+                    "properties": [
+                        {
+                            "id": 1,
+                            "name": "Home",
+                            "rooms": [
+                                {
+                                    "id": 2,
+                                    "name": "Room",
+                                    "targetTemperatureDegrees": target,
+                                }
+                            ],
+                        }
+                    ]
+                }
+            }
+        )
+
+    async def setRooms(self, commands):
+        [[_, _, _, temperature]] = commands
+        self.target = temperature
+        return [temperature]
+
+
+def test_poll_started_before_a_command_keeps_its_result():
+    """A poll sent before a mutation doesn't revert the confirmed value."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            api = FakeTikoApi()
+            coordinator = TikoDataUpdateCoordinator(
+                hass, SimpleNamespace(entry_id="test"), api
+            )
+            await coordinator.async_refresh()
+            assert coordinator.get_room(1, 2).targetTemperatureDegrees == 19.0
+
+            # A poll reads the old data, then the command is confirmed
+            api.paused = asyncio.Event()
+            poll = asyncio.ensure_future(coordinator.async_refresh())
+            await asyncio.sleep(0)
+            coordinator.queue_room_temperature(1, 2, 21.0)
+            await coordinator.async_flush_commands()
+            assert coordinator.get_room(1, 2).targetTemperatureDegrees == 21.0
+
+            api.paused.set()
+            await poll
+            assert coordinator.get_room(1, 2).targetTemperatureDegrees == 21.0
+
+            # A poll sent after the confirmation drops the kept command
+            api.paused = None
+            await coordinator.async_refresh()
+            assert coordinator._commands.items() == []
+            assert coordinator.get_room(1, 2).targetTemperatureDegrees == 21.0
+            await coordinator.async_shutdown()
+
+    asyncio.run(run())
+
+
+def test_commands_are_sent_after_a_maximum_delay(monkeypatch):
+    """A steady stream of changes doesn't hold the batch back forever."""
+    now = [100.0]
+    delays = []
+    monkeypatch.setattr(queueModule.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(
+        queueModule,
+        "async_call_later",
+        lambda hass, delay, action: delays.append(delay) or (lambda: None),
+    )
+
+    queue = queueModule.TikoCommandQueue(None, None)
+    for _ in range(8):
+        queue.enqueue(1, 2, "temperature", 20.0)
+        now[0] += 1
+
+    # Queued each second, sent 5 s after the first change at the latest
+    assert delays == [1.5, 1.5, 1.5, 1.5, 1, 0, 0, 0]
+
+
+def test_registry_events_of_other_entries_are_ignored():
+    """Only the entities of the config entry update the fetched room fields."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            entry = SimpleNamespace(entry_id="test", pref_disable_new_entities=False)
+            otherEntry = SimpleNamespace(
+                entry_id="other", pref_disable_new_entities=False
+            )
+            coordinator = TikoDataUpdateCoordinator(hass, entry, FakeTikoApi())
+            updates = []
+            coordinator._async_update_fields = lambda: updates.append(True)
+
+            registry = er.async_get(hass)
+            other = registry.async_get_or_create(
+                "sensor", "other", "1_2_temperature_current", config_entry=otherEntry
+            )
+            registry.async_update_entity(other.entity_id, disabled_by=None)
+            registry.async_remove(other.entity_id)
+            await hass.async_block_till_done()
+            assert updates == []
+
+            own = registry.async_get_or_create(
+                "sensor", "tiko", "1_2_temperature_current", config_entry=entry
+            )
+            await hass.async_block_till_done()
+            assert len(updates) == 1
+
+            coordinator._entity_ids.add(own.entity_id)
+            registry.async_update_entity(
+                own.entity_id, disabled_by=er.RegistryEntryDisabler.USER
+            )
+            registry.async_remove(own.entity_id)
+            await hass.async_block_till_done()
+            assert len(updates) == 3
+            await coordinator.async_shutdown()
+
+    asyncio.run(run())
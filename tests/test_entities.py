@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from custom_components.tiko.classes.TikoTemperatureSensor import TikoTemperatureSensor
+from custom_components.tiko.models import Room
+
+
+def roomSensor(data, type):
+    """Return a temperature sensor of a room."""
+    room = Room.fromDict({"id": 2, "name": "Room", **data})
+    coordinator = SimpleNamespace(get_room=lambda propertyId, roomId: room)
+    return TikoTemperatureSensor(coordinator, 1, room, type=type)
+
+
+def test_target_temperature():
+    """The target temperature is read from the room."""
+    sensor = roomSensor({"targetTemperatureDegrees": 19.5}, "temperature_target")
+    assert sensor.native_value == 19.5
+
+
+def test_missing_target_temperature():
+    """A null target temperature, heating disabled, has no value."""
+    sensor = roomSensor(
+        {"targetTemperatureDegrees": None, "mode": {"disableHeating": True}},
+        "temperature_target",
+    )
+    assert sensor.native_value is None
+
+
+def test_current_temperature():
+    """The current temperature is read from the room."""
+    sensor = roomSensor({"currentTemperatureDegrees": 18.2}, "temperature_current")
+    assert sensor.native_value == 18.2
@@ -0,0 +1,64 @@
+import re
+
+from custom_components.tiko.queries import (
+    BASE_ROOM_FIELDS,
+    ENTITY_ROOM_FIELDS,
+    ROOM_FIELDS,
+    buildDataQuery,
+    roomFields,
+)
+
+
+def roomSelection(query):
+    """Return the fields selected on the rooms, as "block.field" for nested ones."""
+    rooms = query[query.index("rooms {") : query.index("__typename\n    }")]
+    fields = set()
+    block = None
+    for line in rooms.splitlines()[1:]:
+        line = line.strip()
+        if line.endswith("{"):
+            block = line[:-1].strip()
+        elif line == "}":
+            block = None
+        elif line and line != "__typename":
+            fields.add(f"{block}.{line}" if block else line)
+    return fields
+
+
+def test_base_fields_are_always_fetched():
+    """Without any entity, only the fields used by the coordinator are fetched."""
+    assert roomFields(set()) == frozenset(BASE_ROOM_FIELDS)
+    assert roomSelection(buildDataQuery(roomFields(set()))) == set(BASE_ROOM_FIELDS)
+
+
+def test_entity_fields_are_added():
+    """Each entity type brings its own fields."""
+    fields = roomFields({"battery"})
+    assert "status.sensorBatteryLow" in fields
+    assert "targetTemperatureDegrees" not in fields
+
+    selection = roomSelection(buildDataQuery(fields))
+    assert selection == set(BASE_ROOM_FIELDS) | set(ENTITY_ROOM_FIELDS["battery"])
+
+
+def test_every_entity_selects_every_field():
+    """With every entity type enabled, the full query is built."""
+    fields = roomFields(ENTITY_ROOM_FIELDS)
+    assert fields == frozenset(ROOM_FIELDS)
+    assert buildDataQuery(fields) == buildDataQuery()
+    assert roomSelection(buildDataQuery()) == set(ROOM_FIELDS)
+
+
+def test_consumption_variant():
+    """The consumption variant declares its variables and fetches the consumption."""
+    query = buildDataQuery(roomFields({"humidity"}), consumption=True)
+    assert re.search(r"query HA_GET_DATA_AND_CONSUMPTION\(", query)
+    assert "fastConsumption(" in query
+    assert "fastConsumption" not in buildDataQuery(roomFields({"humidity"}))
+
+
+def test_queries_are_cached():
+    """The same field set returns the same query object."""
+    assert buildDataQuery(roomFields({"climate"})) is buildDataQuery(
+        roomFields({"climate"})
+    )
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from custom_components.tiko.api import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    TikoRateLimiter,
+)
+
+
+def test_burst_is_served_immediately():
+    """Calls within the burst don't wait."""
+
+    async def run():
+        limiter = TikoRateLimiter(rate=1, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        assert time.monotonic() - start < 0.1
+
+    asyncio.run(run())
+
+
+def test_rate_is_bounded_past_the_burst():
+    """Once the burst is spent, calls get a token at the configured rate."""
+
+    async def run():
+        limiter = TikoRateLimiter(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        assert time.monotonic() - start >= 2 / 20 * 0.9
+
+    asyncio.run(run())
+
+
+def test_waiters_are_served_by_priority():
+    """Commands go before the polls, and the polls before the background calls."""
+
+    async def run():
+        limiter = TikoRateLimiter(rate=20, burst=1)
+        await limiter.acquire()
+
+        served = []
+
+        async def call(name, priority):
+            await limiter.acquire(priority)
+            served.append(name)
+
+        await asyncio.gather(
+            call("background", PRIORITY_BACKGROUND),
+            call("poll", PRIORITY_POLL),
+            call("command", PRIORITY_COMMAND),
+        )
+        assert served == ["command", "poll", "background"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_is_skipped():
+    """A cancelled call doesn't hold back the next ones."""
+
+    async def run():
+        limiter = TikoRateLimiter(rate=20, burst=1)
+        await limiter.acquire()
+
+        cancelled = asyncio.ensure_future(limiter.acquire(PRIORITY_COMMAND))
+        waiting = asyncio.ensure_future(limiter.acquire(PRIORITY_POLL))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        await asyncio.wait_for(waiting, 1)
+        assert cancelled.cancelled()
+
+    asyncio.run(run())
@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.tiko.classes import TikoStatisticsImporter as importerModule
+from custom_components.tiko.classes.TikoStatisticsImporter import (
+    BACKFILL_PERIOD,
+    CHUNK_HOURS,
+    HOUR,
+    TikoStatisticsImporter,
+)
+from custom_components.tiko.models import Room, RoomConsumption
+
+from .common import homeAssistant
+
+
+class FakeApi:
+    """Consumption API returning 100 Wh per room and hour."""
+
+    def __init__(self):
+        self.client = self
+        self.periods = []
+
+    async def call(self, func, *args):
+        return await func(*args)
+
+    async def getConsumptionSeries(self, timestampStart, timestampEnd, resolution="h"):
+        self.periods.append((timestampStart, timestampEnd))
+        hours = (timestampEnd - timestampStart) // 3600000
+        return [RoomConsumption(1, 2, None, hours * 100.0, [100.0] * hours)]
+
+
+def test_backfill_requests_one_hourly_window_per_chunk(monkeypatch):
+    """The backfill fetches chunks of hours, one window per request."""
+
+    async def run():
+        async with homeAssistant() as hass:
+            imported = []
+            monkeypatch.setattr(
+                importerModule,
+                "async_add_external_statistics",
+                lambda hass, metadata, statistics: imported.extend(statistics),
+            )
+
+            room = Room.fromDict({"id": 2, "name": "Room"})
+            coordinator = SimpleNamespace(
+                data=[SimpleNamespace(id=1, rooms=[room])]
+            )
+            api = FakeApi()
+            importer = TikoStatisticsImporter(hass, coordinator, api)
+
+            async def loadPosition(statisticId):
+                return None
+
+            importer._async_load_position = loadPosition
+
+            assert await importer.async_import()
+
+            hours = BACKFILL_PERIOD // HOUR
+            assert len(api.periods) == -(-hours // CHUNK_HOURS)
+            assert all(
+                end - start <= CHUNK_HOURS * 3600000 for start, end in api.periods
+            )
+            assert len(imported) == hours
+            assert imported[-1]["sum"] == hours * 100.0
+
+            # Up to date, nothing more is fetched
+            assert await importer.async_import()
+            assert len(api.periods) == -(-hours // CHUNK_HOURS)
+
+    asyncio.run(run())